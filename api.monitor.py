@@ -1,26 +1,156 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session, g
+from flask.json.provider import JSONProvider, DefaultJSONProvider
 from latest_changes import get_latest_change, get_latest_changes_per_job
 from flask_cors import CORS
-import json
+import orjson
 import os
 import uuid
+import asyncio
 import threading
 import time
 import hashlib
+import hmac
 import secrets
+import atexit
+import signal
+import random
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 import logging
 from functools import wraps
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future
 
 # Import the existing WebChangeMonitor class
-from webmonitor import WebChangeMonitor, AIAnalyzer
+from webmonitor import WebChangeMonitor, AIAnalyzer, DriverPool, create_http_session
+from results_log import results_path, read_results, read_result_lines, migrate_legacy_results, ResultsWriter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class IsoClock:
+    """Current local time as an ISO string, formatted at most once per second"""
+    def __init__(self):
+        self._cached = (None, None)  # (epoch second, ISO string), swapped as one object
+    
+    def now(self) -> str:
+        second = int(time.time())
+        cached_second, value = self._cached
+        if second != cached_second:
+            value = datetime.fromtimestamp(second).isoformat()
+            self._cached = (second, value)
+        return value
+
+# Shared clock for status timestamps that only need second precision
+clock = IsoClock()
+
+# Retry delays after a failed check: exponential from the base, capped, plus random jitter
+ERROR_BACKOFF_BASE = 60
+ERROR_BACKOFF_MAX = 3600
+ERROR_BACKOFF_JITTER = 30
+
+def error_backoff(consecutive_errors: int) -> float:
+    """Seconds to wait before retrying after the given number of failures in a row"""
+    delay = min(ERROR_BACKOFF_BASE * 2 ** (consecutive_errors - 1), ERROR_BACKOFF_MAX)
+    return delay + random.uniform(0, ERROR_BACKOFF_JITTER)
+
+class CachedBody:
+    """A response body rebuilt at most once per TTL, or on the next request after invalidate()"""
+    def __init__(self, build, ttl: float):
+        self.build = build
+        self.ttl = ttl
+        self._generation = 0
+        self._cached = (0.0, None)  # (monotonic build time, body), swapped as one object
+    
+    def get(self) -> bytes:
+        built_at, body = self._cached
+        now = time.monotonic()
+        if body is None or now - built_at >= self.ttl:
+            generation = self._generation
+            body = self.build()
+            # Don't keep a body that raced with an invalidation
+            if generation == self._generation:
+                self._cached = (now, body)
+        return body
+    
+    def invalidate(self):
+        self._generation += 1
+        self._cached = (0.0, None)
+
+def write_file_atomic(path: str, data: bytes):
+    """Write a file via temp file + rename so a crash never leaves it half written"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_or_create_secret_key(path: str = "secret.key") -> bytes:
+    """Read the session signing key from disk, generating it on first run"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    
+    # The key is written to a private temp file first and then hard-linked into place,
+    # which fails if the file exists: two processes starting at once agree on one key,
+    # and neither can read the file before its key is fully written
+    key = secrets.token_bytes(32)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            with open(path, 'rb') as f:
+                return f.read()
+        return key
+    finally:
+        os.remove(tmp_path)
+
+class DebouncedSaver:
+    """Runs a save function on a background thread at most once per interval"""
+    def __init__(self, save, interval: float = 1.0):
+        self.save = save
+        self.interval = interval
+        self._dirty = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        # Write out anything still pending when the process exits
+        atexit.register(self.flush)
+    
+    def mark_dirty(self):
+        """Request a save; repeated calls within one interval cost a single write"""
+        self._dirty.set()
+    
+    def flush(self):
+        """Save now if there are unsaved changes"""
+        if self._dirty.is_set():
+            # Clear before saving so changes made during the write trigger another save
+            self._dirty.clear()
+            self.save()
+    
+    def save_now(self, **kwargs):
+        """Save immediately, replacing any pending background save"""
+        self._dirty.clear()
+        self.save(**kwargs)
+    
+    def _run(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.interval)
+            self.flush()
+
 @dataclass
 class User:
     user_id: str
@@ -29,6 +159,7 @@ class User:
     created_at: str
     last_login: Optional[str] = None
     is_active: bool = True
+    api_key: Optional[str] = None
 
 @dataclass
 class MonitoringJob:
@@ -43,22 +174,49 @@ class MonitoringJob:
     total_checks: int = 0
     changes_detected: int = 0
     error_message: Optional[str] = None
+    requires_js: Optional[bool] = None  # True: always use a browser, False: plain HTTP, None: detect from the page
+    
+    def __setattr__(self, name, value):
+        # Any field change invalidates the cached dict form
+        object.__setattr__(self, name, value)
+        if name != '_dict_cache':
+            object.__setattr__(self, '_dict_cache', None)
+    
+    def to_dict(self) -> dict:
+        """Shallow dict form of the job, rebuilt only after a field changes (treat as read-only)"""
+        cached = getattr(self, '_dict_cache', None)
+        if cached is None:
+            # Fields are flat primitives, so a copy of __dict__ minus the cache slot is enough
+            cached = self.__dict__.copy()
+            del cached['_dict_cache']
+            object.__setattr__(self, '_dict_cache', cached)
+        return cached
 
 class UserManager:
-    def __init__(self, users_file="users.json"):
+    def __init__(self, users_file="users.json", flush_interval=0.5):
         self.users_file = users_file
         self.users: Dict[str, User] = {}
+        self._by_email: Dict[str, User] = {}  # lowercased email -> user
+        self._by_api_key: Dict[str, User] = {}  # API key -> user
+        self.active_count = 0  # users with is_active set; counted at load, then bumped on every registration
+        self._save_lock = threading.Lock()
+        # Argon2id with OWASP-recommended parameters
+        self._ph = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=4)
         self.load_users()
+        
+        # Logins and registrations only mark users dirty; users.json is rewritten in the background
+        self._saver = DebouncedSaver(self.save_users, flush_interval)
     
     def load_users(self):
         """Load users from JSON file"""
         try:
             if os.path.exists(self.users_file):
-                with open(self.users_file, 'r') as f:
-                    users_data = json.load(f)
-                    for user_data in users_data:
-                        user = User(**user_data)
-                        self.users[user.user_id] = user
+                with open(self.users_file, 'rb') as f:
+                    users_data = orjson.loads(f.read())
+                self.users = {user_data['user_id']: User(**user_data) for user_data in users_data}
+                self._by_email = {user.email.lower(): user for user in self.users.values()}
+                self._by_api_key = {user.api_key: user for user in self.users.values() if user.api_key}
+                self.active_count = sum(1 for user in self.users.values() if user.is_active)
                 logger.info(f"Loaded {len(self.users)} users from {self.users_file}")
         except Exception as e:
             logger.error(f"Error loading users: {e}")
@@ -66,24 +224,37 @@ class UserManager:
     def save_users(self):
         """Save users to JSON file"""
         try:
-            users_data = [asdict(user) for user in self.users.values()]
-            with open(self.users_file, 'w') as f:
-                json.dump(users_data, f, indent=2)
-            logger.info(f"Saved {len(self.users)} users to {self.users_file}")
+            with self._save_lock:
+                users_data = list(self.users.values())
+                # Users change rarely, so the file stays indented for readability
+                write_file_atomic(self.users_file, orjson.dumps(users_data, option=orjson.OPT_INDENT_2))
+            logger.info(f"Saved {len(users_data)} users to {self.users_file}")
         except Exception as e:
             logger.error(f"Error saving users: {e}")
     
     def hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password using Argon2id"""
+        return self._ph.hash(password)
     
     def verify_password(self, password: str, password_hash: str) -> bool:
-        """Verify password against hash"""
-        return hashlib.sha256(password.encode()).hexdigest() == password_hash
+        """Verify password against hash (Argon2id, or a legacy SHA-256 hex digest)"""
+        if not password_hash.startswith('$argon2'):
+            legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy_hash, password_hash)
+        try:
+            return self._ph.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Check if a stored hash is legacy SHA-256 or uses outdated Argon2 parameters"""
+        if not password_hash.startswith('$argon2'):
+            return True
+        return self._ph.check_needs_rehash(password_hash)
     
     def email_exists(self, email: str) -> bool:
         """Check if email already exists"""
-        return any(user.email == email for user in self.users.values())
+        return email.lower() in self._by_email
     
     def create_user(self, email: str, password: str) -> Optional[str]:
         """Create a new user"""
@@ -101,18 +272,22 @@ class UserManager:
         )
         
         self.users[user_id] = user
-        self.save_users()
+        self._by_email[email.lower()] = user
+        self.active_count += 1
+        self._saver.mark_dirty()
         logger.info(f"Created user {user_id}: {email}")
         return user_id
     
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        for user in self.users.values():
-            if user.email == email and user.is_active:
-                if self.verify_password(password, user.password_hash):
-                    user.last_login = datetime.now().isoformat()
-                    self.save_users()
-                    return user
+        user = self._by_email.get(email.lower())
+        if user and user.is_active and self.verify_password(password, user.password_hash):
+            # Upgrade legacy hashes on successful login
+            if self.needs_rehash(user.password_hash):
+                user.password_hash = self.hash_password(password)
+            user.last_login = datetime.now().isoformat()
+            self._saver.mark_dirty()
+            return user
         return None
     
     def get_user(self, user_id: str) -> Optional[User]:
@@ -121,53 +296,123 @@ class UserManager:
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        for user in self.users.values():
-            if user.email == email:
-                return user
-        return None
+        return self._by_email.get(email.lower())
+    
+    def get_user_by_api_key(self, api_key: str) -> Optional[User]:
+        """Get user by API key"""
+        return self._by_api_key.get(api_key)
+    
+    def assign_api_key(self, user_id: str) -> Optional[str]:
+        """Issue a new API key for a user, revoking the previous one"""
+        user = self.users.get(user_id)
+        if not user:
+            return None
+        if user.api_key:
+            self._by_api_key.pop(user.api_key, None)
+        user.api_key = secrets.token_urlsafe(32)
+        self._by_api_key[user.api_key] = user
+        self._saver.mark_dirty()
+        return user.api_key
 
 class JobManager:
-    def __init__(self, jobs_file="jobs.json", results_dir="results"):
+    def __init__(self, jobs_file="jobs.json", results_dir="results", flush_interval=1.0, scrape_workers=None):
         self.jobs_file = jobs_file
         self.results_dir = results_dir
         self.jobs: Dict[str, MonitoringJob] = {}
         self.monitors: Dict[str, WebChangeMonitor] = {}
-        self.monitor_threads: Dict[str, threading.Thread] = {}
-        self.stop_events: Dict[str, threading.Event] = {}
+        self.monitor_tasks: Dict[str, Future] = {}
+        self.stop_events: Dict[str, asyncio.Event] = {}
+        self._results_files: Dict[str, str] = {}  # job_id -> results log path
+        # One thread appends results for every job, batching writes per file
+        self.results_writer = ResultsWriter(on_write=self._on_results_written)
+        # Cached results summaries for get_job_stats, keyed by results log path
+        self._stats_cache: Dict[str, dict] = {}
+        self._results_versions: Counter = Counter()
+        # Bumped on every results write or deletion; together with a per-process id it
+        # identifies the state of all results logs, for ETags on /api/changes/latest
+        self.results_generation = 0
+        self._instance_id = uuid.uuid4().hex[:8]
+        
+        # Guards the job table and status counters; held only for in-memory updates,
+        # never across file I/O
+        self._lock = threading.RLock()
+        self._shut_down = False
+        
+        # user_id -> {job_id: job}, so per-user listings don't scan every job
+        self._user_jobs: Dict[str, Dict[str, MonitoringJob]] = defaultdict(dict)
+        
+        # Job counts per status, kept up to date on every status transition
+        self.status_counts: Counter = Counter()
+        self.user_status_counts: Dict[str, Counter] = defaultdict(Counter)
+        
+        # Sum of changes_detected over all jobs and per user, kept up to date on every detection
+        self.total_changes = 0
+        self.user_changes: Counter = Counter()
+        
+        # All jobs are scheduled as tasks on one event loop running in a background
+        # thread; the blocking Selenium/AI work runs on a bounded worker pool
+        self.loop = asyncio.new_event_loop()
+        if scrape_workers is None:
+            scrape_workers = (os.cpu_count() or 1) * 4
+        self.scrape_pool = ThreadPoolExecutor(max_workers=scrape_workers, thread_name_prefix="mon")
+        # Jobs borrow browsers from one shared pool instead of each running its own
+        self.driver_pool = DriverPool(size=scrape_workers)
+        # Pages that render without JavaScript are fetched over one keep-alive session
+        self.http_session = create_http_session()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        
+        self._flush_lock = threading.Lock()
         
         # Ensure results directory exists
         os.makedirs(results_dir, exist_ok=True)
         
+        # Convert results stored in the old whole-array format to append-only logs
+        try:
+            migrated = migrate_legacy_results(results_dir)
+            if migrated:
+                logger.info(f"Migrated {migrated} results files to JSON Lines")
+        except Exception as e:
+            logger.error(f"Error migrating results files: {e}")
+        
         # Load existing jobs
         self.load_jobs()
         
+        # Job state changes only mark the table dirty; one background thread
+        # rewrites jobs.json at most once per flush_interval
+        self._saver = DebouncedSaver(self.save_jobs, flush_interval)
+        
     def load_jobs(self):
         """Load jobs from JSON file"""
         try:
             if os.path.exists(self.jobs_file):
-                with open(self.jobs_file, 'r') as f:
-                    jobs_data = json.load(f)
-                    for job_data in jobs_data:
-                        # Handle jobs without user_id (for backward compatibility)
-                        if 'user_id' not in job_data:
-                            job_data['user_id'] = 'legacy'
-                        job = MonitoringJob(**job_data)
-                        self.jobs[job.job_id] = job
+                with open(self.jobs_file, 'rb') as f:
+                    jobs_data = orjson.loads(f.read())
+                # Jobs without user_id (for backward compatibility) default to 'legacy'
+                jobs = [MonitoringJob(**{'user_id': 'legacy', **job_data}) for job_data in jobs_data]
+                # One lock acquisition for the whole table instead of one per job
+                with self._lock:
+                    for job in jobs:
+                        self._add_job(job)
                 logger.info(f"Loaded {len(self.jobs)} jobs from {self.jobs_file}")
         except Exception as e:
             logger.error(f"Error loading jobs: {e}")
     
-    def save_jobs(self):
-        """Save jobs to JSON file"""
+    def save_jobs(self, pretty: bool = False):
+        """Save jobs to JSON file (compact unless pretty is set)"""
         try:
-            jobs_data = [asdict(job) for job in self.jobs.values()]
-            with open(self.jobs_file, 'w') as f:
-                json.dump(jobs_data, f, indent=2)
-            logger.info(f"Saved {len(self.jobs)} jobs to {self.jobs_file}")
+            # Snapshot under the table lock, then serialize and write outside it
+            with self._lock:
+                snapshot = [job.to_dict() for job in self.jobs.values()]
+            with self._flush_lock:
+                data = orjson.dumps(snapshot, option=orjson.OPT_INDENT_2 if pretty else 0)
+                write_file_atomic(self.jobs_file, data)
+            logger.info(f"Saved {len(snapshot)} jobs to {self.jobs_file}")
         except Exception as e:
             logger.error(f"Error saving jobs: {e}")
     
-    def create_job(self, user_id: str, name: str, url: str, check_interval_minutes: int) -> str:
+    def create_job(self, user_id: str, name: str, url: str, check_interval_minutes: int,
+                   requires_js: Optional[bool] = None) -> str:
         """Create a new monitoring job for a specific user"""
         job_id = str(uuid.uuid4())
         job = MonitoringJob(
@@ -177,16 +422,107 @@ class JobManager:
             url=url,
             check_interval_minutes=check_interval_minutes,
             created_at=datetime.now().isoformat(),
-            status='created'
+            status='created',
+            requires_js=requires_js
         )
-        self.jobs[job_id] = job
-        self.save_jobs()
+        self._add_job(job)
+        self._saver.mark_dirty()
         logger.info(f"Created job {job_id}: {name} for user {user_id}")
         return job_id
     
-    def get_user_jobs(self, user_id: str) -> List[MonitoringJob]:
-        """Get all jobs for a specific user"""
-        return [job for job in self.jobs.values() if job.user_id == user_id]
+    def create_jobs(self, user_id: str, specs: List[tuple]) -> List[str]:
+        """Create several jobs for a user at once from (name, url, check_interval_minutes, requires_js) tuples"""
+        created_at = datetime.now().isoformat()
+        jobs = [
+            MonitoringJob(
+                job_id=str(uuid.uuid4()),
+                user_id=user_id,
+                name=name,
+                url=url,
+                check_interval_minutes=check_interval_minutes,
+                created_at=created_at,
+                status='created',
+                requires_js=requires_js
+            )
+            for name, url, check_interval_minutes, requires_js in specs
+        ]
+        # One lock acquisition and one jobs.json write for the whole batch
+        with self._lock:
+            for job in jobs:
+                self._add_job(job)
+        self._saver.mark_dirty()
+        logger.info(f"Created {len(jobs)} jobs for user {user_id}")
+        return [job.job_id for job in jobs]
+    
+    def _add_job(self, job: MonitoringJob):
+        """Insert a job into the table, the per-user index and the status counters"""
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._user_jobs[job.user_id][job.job_id] = job
+            self._count_job(job, 1)
+    
+    def _remove_job(self, job_id: str):
+        """Remove a job from the table, the per-user index and the status counters"""
+        with self._lock:
+            job = self.jobs.pop(job_id)
+            user_jobs = self._user_jobs.get(job.user_id)
+            if user_jobs is not None:
+                user_jobs.pop(job_id, None)
+                if not user_jobs:
+                    del self._user_jobs[job.user_id]
+            self._count_job(job, -1)
+    
+    def _count_job(self, job: MonitoringJob, delta: int):
+        """Add (or with delta=-1 remove) a job from the status and change counters"""
+        self.status_counts[job.status] += delta
+        self.user_status_counts[job.user_id][job.status] += delta
+        self.total_changes += delta * job.changes_detected
+        self.user_changes[job.user_id] += delta * job.changes_detected
+    
+    def _add_changes(self, job: MonitoringJob, count: int):
+        """Record newly detected changes on a job and in the change counters"""
+        with self._lock:
+            job.changes_detected += count
+            if job.job_id in self.jobs:
+                self.total_changes += count
+                self.user_changes[job.user_id] += count
+    
+    def _set_status(self, job: MonitoringJob, status: str):
+        """Change a job's status and move it between the status counters"""
+        with self._lock:
+            if job.status == status:
+                return
+            if job.job_id not in self.jobs:
+                # Deleted job whose task is still winding down; it is no longer counted
+                job.status = status
+                return
+            self._count_job(job, -1)
+            job.status = status
+            self._count_job(job, 1)
+    
+    def get_status_counts(self, user_id: Optional[str] = None) -> Counter:
+        """Job counts per status, for one user or for all jobs"""
+        with self._lock:
+            counts = self.status_counts if user_id is None else self.user_status_counts.get(user_id, Counter())
+            return +counts  # copy without zero entries
+    
+    def get_user_totals(self, user_id: str):
+        """Job count and total changes detected for a user, read from the counters"""
+        with self._lock:
+            return len(self._user_jobs.get(user_id, {})), self.user_changes[user_id]
+    
+    def get_totals(self):
+        """Job count and total changes detected across all jobs, read from the counters"""
+        with self._lock:
+            return len(self.jobs), self.total_changes
+    
+    def get_user_jobs(self, user_id: str, statuses: Optional[set] = None) -> List[MonitoringJob]:
+        """Get all jobs for a specific user, optionally only those in `statuses`"""
+        with self._lock:
+            jobs = self._user_jobs.get(user_id, {}).values()
+            if statuses is None:
+                return list(jobs)
+            return [job for job in jobs if job.status in statuses]
     
     def user_owns_job(self, user_id: str, job_id: str) -> bool:
         """Check if user owns the specified job"""
@@ -204,81 +540,98 @@ class JobManager:
         
         try:
             # Create monitor instance
-            monitor = WebChangeMonitor(url=job.url, api_key=api_key)
+            monitor = WebChangeMonitor(url=job.url, api_key=api_key, driver_pool=self.driver_pool,
+                                       http_session=self.http_session, requires_js=job.requires_js)
             self.monitors[job_id] = monitor
             
             # Create stop event
-            stop_event = threading.Event()
+            stop_event = asyncio.Event()
             self.stop_events[job_id] = stop_event
             
-            # Create and start monitoring thread
-            thread = threading.Thread(
-                target=self._monitor_job,
-                args=(job_id, stop_event),
-                daemon=True
+            # Schedule the monitoring task on the event loop
+            self.monitor_tasks[job_id] = asyncio.run_coroutine_threadsafe(
+                self._monitor_job(job_id, stop_event), self.loop
             )
-            self.monitor_threads[job_id] = thread
-            thread.start()
             
             # Update job status
-            job.status = 'running'
-            self.save_jobs()
+            self._set_status(job, 'running')
+            self._saver.mark_dirty()
             
             logger.info(f"Started monitoring job {job_id}")
             return True
             
         except Exception as e:
-            job.status = 'error'
+            self._set_status(job, 'error')
             job.error_message = str(e)
-            self.save_jobs()
+            self._saver.mark_dirty()
             logger.error(f"Error starting job {job_id}: {e}")
             return False
     
-    def _monitor_job(self, job_id: str, stop_event: threading.Event):
+    async def _wait_for_stop(self, stop_event: asyncio.Event, timeout: float) -> bool:
+        """Sleep for up to `timeout` seconds; return True if the job was stopped meanwhile"""
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def _check_for_changes(self, monitor: WebChangeMonitor):
+        """Scrape the page and compare it with the current content (blocking)"""
+        new_content = monitor.scrape_page()
+        if not new_content:
+            # scrape_page logs and swallows its own errors; count an empty scrape as a failed check
+            raise RuntimeError(f"No content scraped from {monitor.url}")
+        detected_changes = []
+        if monitor.current_content:
+            detected_changes = monitor.compare_content(monitor.current_content, new_content)
+        return new_content, detected_changes
+    
+    async def _monitor_job(self, job_id: str, stop_event: asyncio.Event):
         """Main monitoring loop for a job"""
         job = self.jobs[job_id]
         monitor = self.monitors[job_id]
+        loop = asyncio.get_running_loop()
         
         try:
             logger.info(f"Starting monitoring loop for job {job_id}")
             
             # Initial scrape
-            monitor.current_content = monitor.scrape_page()
+            monitor.current_content = await loop.run_in_executor(self.scrape_pool, monitor.scrape_page)
             if monitor.current_content:
                 job.total_checks += 1
-                job.last_check = datetime.now().isoformat()
-                self.save_jobs()
+                job.last_check = clock.now()
+                self._saver.mark_dirty()
                 logger.info(f"Initial scrape completed for job {job_id}")
             
             # Wait for initial period before first comparison
             initial_wait = min(job.check_interval_minutes * 60, 120)  # Max 2 minutes
-            if stop_event.wait(initial_wait):
+            if await self._wait_for_stop(stop_event, initial_wait):
                 return
             
+            consecutive_errors = 0
             while not stop_event.is_set():
                 try:
-                    # Scrape new content
-                    new_content = monitor.scrape_page()
+                    # Scrape new content and compare with previous content
+                    new_content, detected_changes = await loop.run_in_executor(
+                        self.scrape_pool, self._check_for_changes, monitor
+                    )
                     job.total_checks += 1
-                    job.last_check = datetime.now().isoformat()
+                    job.last_check = clock.now()
+                    consecutive_errors = 0
                     
-                    if new_content and monitor.current_content:
-                        # Compare with previous content
-                        detected_changes = monitor.compare_content(monitor.current_content, new_content)
-                        
+                    if not monitor.current_content:
+                        # The initial scrape failed; this check becomes the baseline
+                        monitor.current_content = new_content
+                    else:
                         if detected_changes:
-                            job.changes_detected += len(detected_changes)
+                            self._add_changes(job, len(detected_changes))
                             logger.info(f"Job {job_id}: {len(detected_changes)} changes detected")
                             
                             # Save changes to results file
                             self._save_results(job_id, detected_changes)
                             
-                            # Update monitor's changes list
+                            # Update monitor's changes list (capped at the last 50 by its deque)
                             monitor.changes.extend(detected_changes)
-                            
-                            # Keep only last 50 changes to prevent memory issues
-                            if len(monitor.changes) > 50:
-                                monitor.changes = monitor.changes[-50:]
                         else:
                             logger.info(f"Job {job_id}: No changes detected")
                         
@@ -287,91 +640,145 @@ class JobManager:
                         monitor.current_content = new_content
                     
                     # Save job status
-                    self.save_jobs()
+                    self._saver.mark_dirty()
                     
                     # Wait for next check
                     wait_time = job.check_interval_minutes * 60
-                    if stop_event.wait(wait_time):
+                    if await self._wait_for_stop(stop_event, wait_time):
                         break
                         
                 except Exception as e:
-                    logger.error(f"Error in monitoring loop for job {job_id}: {e}")
+                    consecutive_errors += 1
+                    logger.error(f"Error in monitoring loop for job {job_id} "
+                                 f"({consecutive_errors} in a row): {e}")
                     job.error_message = str(e)
-                    self.save_jobs()
-                    time.sleep(60)  # Wait before retrying
+                    self._saver.mark_dirty()
+                    # Back off further with each failure so a dead site isn't hammered
+                    if await self._wait_for_stop(stop_event, error_backoff(consecutive_errors)):
+                        break
                     
         except Exception as e:
-            job.status = 'error'
+            self._set_status(job, 'error')
             job.error_message = str(e)
             logger.error(f"Fatal error in job {job_id}: {e}")
         finally:
-            job.status = 'stopped'
-            self.save_jobs()
+            # A job that ended in error keeps that status so it shows up as failed
+            if job.status != 'error':
+                self._set_status(job, 'stopped')
+            self._saver.mark_dirty()
             # Cleanup
-            if job_id in self.monitors:
-                if self.monitors[job_id].driver:
-                    self.monitors[job_id].driver.quit()
-                del self.monitors[job_id]
+            monitor = self.monitors.pop(job_id, None)
+            if monitor and monitor.driver:
+                await loop.run_in_executor(self.scrape_pool, monitor.driver.quit)
+    
+    def _results_file(self, job_id: str) -> str:
+        """Results log path for a job, resolved once and then cached"""
+        path = self._results_files.get(job_id)
+        if path is None:
+            path = self._results_files[job_id] = results_path(self.results_dir, job_id)
+        return path
+    
+    def _on_results_written(self, path: str):
+        """Invalidate cached stats once new results land in a log (writer thread)"""
+        self._results_versions[path] += 1
+        self._stats_cache.pop(path, None)
+        self.results_generation += 1
+    
+    def results_etag(self) -> str:
+        """Tag that changes whenever any results log is written or removed"""
+        return f"{self._instance_id}-{self.results_generation}"
     
     def _save_results(self, job_id: str, changes: List[dict]):
-        """Save detection results to file"""
+        """Queue detection results for appending to the job's results log"""
         try:
-            results_file = os.path.join(self.results_dir, f"{job_id}.json")
-            
-            # Load existing results
-            existing_results = []
-            if os.path.exists(results_file):
-                with open(results_file, 'r') as f:
-                    existing_results = json.load(f)
+            results_file = self._results_file(job_id)
             
-            # Add new changes
+            # Full precision timestamp, formatted once for the whole batch
+            detected_at = datetime.now().isoformat()
             for change in changes:
-                change['detected_at'] = datetime.now().isoformat()
-                existing_results.append(change)
-            
-            # Keep only last 200 results
-            if len(existing_results) > 200:
-                existing_results = existing_results[-200:]
+                change['detected_at'] = detected_at
             
-            # Save results
-            with open(results_file, 'w') as f:
-                json.dump(existing_results, f, indent=2)
+            # Append only the new changes; readers see the newest 200 records
+            self.results_writer.submit(results_file, changes)
                 
         except Exception as e:
             logger.error(f"Error saving results for job {job_id}: {e}")
     
     def stop_job(self, job_id: str) -> bool:
         """Stop monitoring for a specific job"""
-        if job_id not in self.jobs:
-            return False
-        
-        job = self.jobs[job_id]
-        
-        # Signal stop event
-        if job_id in self.stop_events:
-            self.stop_events[job_id].set()
-        
-        # Wait for thread to finish
-        if job_id in self.monitor_threads:
-            thread = self.monitor_threads[job_id]
-            thread.join(timeout=5)
-            del self.monitor_threads[job_id]
-        
-        # Cleanup monitor
-        if job_id in self.monitors:
-            if self.monitors[job_id].driver:
-                self.monitors[job_id].driver.quit()
-            del self.monitors[job_id]
-        
-        # Cleanup stop event
-        if job_id in self.stop_events:
-            del self.stop_events[job_id]
-        
-        job.status = 'stopped'
-        self.save_jobs()
-        
-        logger.info(f"Stopped job {job_id}")
-        return True
+        return bool(self.stop_jobs([job_id]))
+    
+    def stop_jobs(self, job_ids: List[str], timeout: float = 5) -> List[str]:
+        """Stop several jobs at once; returns the ids that exist (and are now stopped)"""
+        job_ids = [job_id for job_id in job_ids if job_id in self.jobs]
+        
+        # Signal every job first, then wait for them together
+        for job_id in job_ids:
+            stop_event = self.stop_events.get(job_id)
+            if stop_event is not None:
+                self.loop.call_soon_threadsafe(stop_event.set)
+        
+        # Wait for the monitoring tasks to finish against one shared deadline
+        deadline = time.monotonic() + timeout
+        for job_id in job_ids:
+            task = self.monitor_tasks.pop(job_id, None)
+            if task is None:
+                continue
+            try:
+                task.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception:
+                # Still busy in a scrape; cancel it at the next await
+                task.cancel()
+        
+        stopped = []
+        for job_id in job_ids:
+            # Cleanup monitor
+            monitor = self.monitors.pop(job_id, None)
+            if monitor and monitor.driver:
+                monitor.driver.quit()
+            
+            # Cleanup stop event
+            self.stop_events.pop(job_id, None)
+            
+            # Skip jobs deleted while their task was winding down
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            self._set_status(job, 'stopped')
+            stopped.append(job_id)
+            logger.info(f"Stopped job {job_id}")
+        
+        if stopped:
+            self._saver.mark_dirty()
+        return stopped
+    
+    def shutdown(self, timeout: float = 5):
+        """Stop all monitoring tasks at once and shut down the worker pool"""
+        with self._lock:
+            if self._shut_down:
+                return
+            self._shut_down = True
+        
+        # Signal every job first, then wait for them together
+        for stop_event in list(self.stop_events.values()):
+            self.loop.call_soon_threadsafe(stop_event.set)
+        
+        # Tasks wind down concurrently, so wait against one shared deadline
+        deadline = time.monotonic() + timeout
+        for task in list(self.monitor_tasks.values()):
+            try:
+                task.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception:
+                task.cancel()
+        self.monitor_tasks.clear()
+        self.stop_events.clear()
+        
+        self.scrape_pool.shutdown(wait=True, cancel_futures=True)
+        self.results_writer.flush()
+        self.driver_pool.close()
+        self.http_session.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._saver.save_now(pretty=True)
     
     def pause_job(self, job_id: str) -> bool:
         """Pause monitoring for a specific job"""
@@ -384,10 +791,10 @@ class JobManager:
         
         # Signal stop event (will pause the job)
         if job_id in self.stop_events:
-            self.stop_events[job_id].set()
+            self.loop.call_soon_threadsafe(self.stop_events[job_id].set)
         
-        job.status = 'paused'
-        self.save_jobs()
+        self._set_status(job, 'paused')
+        self._saver.mark_dirty()
         
         logger.info(f"Paused job {job_id}")
         return True
@@ -400,14 +807,19 @@ class JobManager:
         # Stop the job first
         self.stop_job(job_id)
         
-        # Delete results file
-        results_file = os.path.join(self.results_dir, f"{job_id}.json")
-        if os.path.exists(results_file):
+        # Delete results file once any queued writes for it have landed
+        self.results_writer.flush()
+        results_file = self._results_files.pop(job_id, None) or results_path(self.results_dir, job_id)
+        self.results_writer.forget(results_file)
+        self._on_results_written(results_file)
+        try:
             os.remove(results_file)
+        except FileNotFoundError:
+            pass
         
         # Remove job
-        del self.jobs[job_id]
-        self.save_jobs()
+        self._remove_job(job_id)
+        self._saver.mark_dirty()
         
         logger.info(f"Deleted job {job_id}")
         return True
@@ -418,16 +830,26 @@ class JobManager:
     
     def get_all_jobs(self) -> List[MonitoringJob]:
         """Get all jobs"""
-        return list(self.jobs.values())
+        with self._lock:
+            return list(self.jobs.values())
     
     def get_job_results(self, job_id: str, limit: int = 50) -> List[dict]:
         """Get results for a specific job"""
         try:
-            results_file = os.path.join(self.results_dir, f"{job_id}.json")
-            if os.path.exists(results_file):
-                with open(results_file, 'r') as f:
-                    results = json.load(f)
-                return results[-limit:] if limit else results
+            return read_results(self._results_file(job_id), limit)
+        except FileNotFoundError:
+            # No changes recorded yet
+            return []
+        except Exception as e:
+            logger.error(f"Error loading results for job {job_id}: {e}")
+            return []
+    
+    def get_job_result_lines(self, job_id: str, limit: int = 50) -> List[bytes]:
+        """Get results for a specific job as raw JSON records"""
+        try:
+            return read_result_lines(self._results_file(job_id), limit)
+        except FileNotFoundError:
+            # No changes recorded yet
             return []
         except Exception as e:
             logger.error(f"Error loading results for job {job_id}: {e}")
@@ -439,12 +861,10 @@ class JobManager:
             return {}
         
         job = self.jobs[job_id]
-        results = self.get_job_results(job_id)
         
         # Calculate statistics
         stats = {
             'total_checks': job.total_checks,
-            'total_changes': len(results),
             'changes_detected': job.changes_detected,
             'last_check': job.last_check,
             'status': job.status,
@@ -452,24 +872,39 @@ class JobManager:
             'error_message': job.error_message
         }
         
-        # Calculate change types
-        change_types = {}
-        for result in results:
-            change_type = result.get('type', 'unknown')
-            change_types[change_type] = change_types.get(change_type, 0) + 1
+        # Figures derived from the results log are cached until the log is written again
+        results_file = self._results_file(job_id)
+        result_stats = self._stats_cache.get(results_file)
+        if result_stats is None:
+            version = self._results_versions[results_file]
+            result_stats = self._summarize_results(self.get_job_results(job_id))
+            # Don't cache a summary that raced with a write to the log
+            if self._results_versions[results_file] == version:
+                self._stats_cache[results_file] = result_stats
+        stats.update(result_stats)
+        
+        return stats
+    
+    def _summarize_results(self, results: List[dict]) -> dict:
+        """Aggregate change types and AI detections over a job's results"""
+        stats = {'total_changes': len(results)}
         
-        stats['change_types'] = change_types
+        # Calculate change types
+        stats['change_types'] = dict(Counter(result.get('type', 'unknown') for result in results))
         
         # Calculate AI detections if available
         ai_detections = 0
         companies_detected = []
+        companies_seen = set()  # O(1) membership; the list keeps first-seen order
         for result in results:
             if result.get('ai_analysis', {}).get('new_companies_detected'):
                 ai_detections += 1
                 companies = result.get('ai_analysis', {}).get('companies', [])
                 for company in companies:
-                    if company.get('name') not in companies_detected:
-                        companies_detected.append(company.get('name'))
+                    name = company.get('name')
+                    if name and name not in companies_seen:
+                        companies_seen.add(name)
+                        companies_detected.append(name)
         
         stats['ai_detections'] = ai_detections
         stats['companies_detected'] = companies_detected
@@ -478,14 +913,55 @@ class JobManager:
 
 # Initialize Flask app, user manager, and job manager
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a decode/encode round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=DefaultJSONProvider.default), mimetype="application/json"
+        )
+
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(32)  # Generate a secure secret key
+app.json = OrjsonProvider(app)
+
+# Persistent key so session cookies survive restarts
+app.secret_key = os.getenv('FLASK_SECRET') or load_or_create_secret_key()
 # Enable CORS for all routes and origins
 CORS(app, supports_credentials=True)
 user_manager = UserManager()
-job_manager = JobManager()
+# Size of the worker pool shared by all jobs for page loads and AI calls (default: 4 per CPU)
+MONITOR_WORKERS = int(os.getenv('MONITOR_WORKERS', '0')) or None
+job_manager = JobManager(scrape_workers=MONITOR_WORKERS)
+# Request-handling threads for the WSGI server (default: 8)
+WEB_THREADS = int(os.getenv('WEB_THREADS', '0')) or 8
 API_KEY = os.getenv('API_KEY')  # Load from environment
 
+def parse_job_fields(data) -> tuple:
+    """Validate a job creation payload, returning (name, url, check_interval_minutes, requires_js)"""
+    if not isinstance(data, dict) or not all(k in data for k in ['name', 'url', 'check_interval_minutes']):
+        raise ValueError('Missing required fields: name, url, check_interval_minutes')
+    
+    try:
+        check_interval = int(data['check_interval_minutes'])
+    except (TypeError, ValueError):
+        raise ValueError('check_interval_minutes must be an integer')
+    if check_interval < 1:
+        raise ValueError('check_interval_minutes must be at least 1')
+    
+    # Optional; left out (or null) to let the first fetch decide
+    requires_js = data.get('requires_js')
+    if requires_js is not None and not isinstance(requires_js, bool):
+        raise ValueError('requires_js must be true, false or null')
+    
+    return data['name'], data['url'], check_interval, requires_js
+
 # Authentication decorator - supports both session and token auth
 def require_auth(f):
     @wraps(f)
@@ -493,14 +969,16 @@ def require_auth(f):
         user_id = None
         
         # Method 1: Check session (existing cookie-based auth)
-        if 'user_id' in session:
-            user_id = session['user_id']
+        session_user_id = session.get('user_id')
+        if session_user_id is not None:
+            user_id = session_user_id
         
         # Method 2: Check Authorization header (Bearer token)
         elif 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                user_id = auth_header[7:]  # Remove 'Bearer ' prefix
+            # One split of the header yields both the scheme and the token
+            scheme, sep, token = request.headers['Authorization'].partition(' ')
+            if scheme == 'Bearer' and sep:
+                user_id = token
         
         # Method 3: Check X-User-Token header
         elif 'X-User-Token' in request.headers:
@@ -515,15 +993,20 @@ def require_auth(f):
         
         user = user_manager.get_user(user_id)
         if not user or not user.is_active:
-            if 'user_id' in session:
+            if session_user_id is not None:
                 session.pop('user_id', None)
             return jsonify({'error': 'Invalid authentication credentials'}), 401
         
-        # Store current user for use in route handlers
-        request.current_user_id = user_id
+        # Resolved once per request; handlers read it from g instead of looking it up again
+        g.user = user
         return f(*args, **kwargs)
     return decorated_function
 
+@app.before_request
+def clear_current_user():
+    """Start every request anonymous; require_auth sets g.user for protected routes"""
+    g.user = None
+
 # Authentication routes
 @app.route('/api/auth/register', methods=['POST'])
 def register():
@@ -548,6 +1031,7 @@ def register():
         user_id = user_manager.create_user(email, password)
         if not user_id:
             return jsonify({'error': 'Email already exists'}), 409
+        admin_stats.invalidate()
         
         # Auto-login after registration
         session['user_id'] = user_id
@@ -619,9 +1103,9 @@ def logout():
 def get_profile():
     """Get user profile"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
-        user = user_manager.get_user(user_id)
-        user_jobs = job_manager.get_user_jobs(user.user_id)
+        # require_auth already resolved the user
+        user = g.user
+        total_jobs, total_changes = job_manager.get_user_totals(user.user_id)
         
         return jsonify({
             'success': True,
@@ -630,9 +1114,9 @@ def get_profile():
                 'email': user.email,
                 'created_at': user.created_at,
                 'last_login': user.last_login,
-                'total_jobs': len(user_jobs),
-                'running_jobs': len([j for j in user_jobs if j.status == 'running']),
-                'total_changes': sum(j.changes_detected for j in user_jobs)
+                'total_jobs': total_jobs,
+                'running_jobs': job_manager.get_status_counts(user.user_id)['running'],
+                'total_changes': total_changes
             }
         })
     except Exception as e:
@@ -647,43 +1131,144 @@ def create_job():
         data = request.get_json()
         
         # Validate input
-        if not data or not all(k in data for k in ['name', 'url', 'check_interval_minutes']):
-            return jsonify({
-                'error': 'Missing required fields: name, url, check_interval_minutes'
-            }), 400
-        
-        name = data['name']
-        url = data['url']
-        check_interval = int(data['check_interval_minutes'])
-        
-        if check_interval < 1:
-            return jsonify({'error': 'check_interval_minutes must be at least 1'}), 400
+        try:
+            name, url, check_interval, requires_js = parse_job_fields(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Create job for authenticated user
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
-        job_id = job_manager.create_job(user_id, name, url, check_interval)
+        user_id = g.user.user_id
+        job_id = job_manager.create_job(user_id, name, url, check_interval, requires_js)
+        admin_stats.invalidate()
         job = job_manager.get_job(job_id)
         
         return jsonify({
             'success': True,
             'job_id': job_id,
-            'job': asdict(job),
+            'job': job.to_dict(),
             'message': f'Job "{name}" created successfully'
         }), 201
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs/bulk', methods=['POST'])
+@require_auth
+def create_jobs_bulk():
+    """Create many monitoring jobs in one request"""
+    try:
+        data = request.get_json(silent=True)
+        
+        if not isinstance(data, dict) or not isinstance(data.get('jobs'), list):
+            return jsonify({'error': 'Request body must contain a "jobs" list'}), 400
+        
+        # Invalid entries are reported back by index; the valid ones are still created
+        specs = []
+        indexes = []
+        errors = []
+        for index, job_data in enumerate(data['jobs']):
+            try:
+                specs.append(parse_job_fields(job_data))
+                indexes.append(index)
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+        
+        job_ids = job_manager.create_jobs(g.user.user_id, specs)
+        admin_stats.invalidate()
+        
+        return jsonify({
+            'success': True,
+            'created': [
+                {'index': index, 'job_id': job_id, 'name': name}
+                for index, job_id, (name, *_) in zip(indexes, job_ids, specs)
+            ],
+            'errors': errors,
+            'total_created': len(job_ids)
+        }), 201
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _owned_job_ids(data) -> tuple:
+    """Split a batch request's "job_ids" into ids the current user owns and per-id errors"""
+    if not isinstance(data, dict) or not isinstance(data.get('job_ids'), list):
+        raise ValueError('Request body must contain a "job_ids" list')
+    owned = []
+    failed = []
+    for job_id in data['job_ids']:
+        if isinstance(job_id, str) and job_manager.user_owns_job(g.user.user_id, job_id):
+            owned.append(job_id)
+        else:
+            failed.append({'job_id': job_id, 'error': 'Job not found or access denied'})
+    return owned, failed
+
+@app.route('/api/jobs/batch_start', methods=['POST'])
+@require_auth
+def start_jobs_batch():
+    """Start many monitoring jobs in one request"""
+    try:
+        data = request.get_json(silent=True)
+        try:
+            job_ids, failed = _owned_job_ids(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        api_key = data.get('api_key', API_KEY)
+        started = []
+        for job_id in job_ids:
+            if job_manager.start_job(job_id, api_key):
+                started.append(job_id)
+            else:
+                failed.append({'job_id': job_id, 'error': 'Failed to start job'})
+        admin_stats.invalidate()
+        
+        return jsonify({
+            'success': True,
+            'started': started,
+            'failed': failed,
+            'total_started': len(started)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/batch_stop', methods=['POST'])
+@require_auth
+def stop_jobs_batch():
+    """Stop many monitoring jobs in one request"""
+    try:
+        data = request.get_json(silent=True)
+        try:
+            job_ids, failed = _owned_job_ids(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # The jobs wind down together, so this waits about as long as a single stop
+        stopped = job_manager.stop_jobs(job_ids)
+        admin_stats.invalidate()
+        
+        return jsonify({
+            'success': True,
+            'stopped': stopped,
+            'failed': failed,
+            'total_stopped': len(stopped)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/jobs', methods=['GET'])
 @require_auth
 def get_user_jobs():
-    """Get all monitoring jobs for authenticated user"""
+    """Get all monitoring jobs for authenticated user (?status=running,paused to filter)"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
-        jobs = job_manager.get_user_jobs(user_id)
+        user_id = g.user.user_id
+        status = request.args.get('status')
+        statuses = {s.strip() for s in status.split(',')} if status else None
+        jobs = job_manager.get_user_jobs(user_id, statuses)
         return jsonify({
             'success': True,
-            'jobs': [asdict(job) for job in jobs],
+            'jobs': [job.to_dict() for job in jobs],
             'total': len(jobs)
         })
     except Exception as e:
@@ -694,14 +1279,14 @@ def get_user_jobs():
 def get_job(job_id):
     """Get specific job details"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
         job = job_manager.get_job(job_id)
         return jsonify({
             'success': True,
-            'job': asdict(job)
+            'job': job.to_dict()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -711,7 +1296,7 @@ def get_job(job_id):
 def start_job(job_id):
     """Start monitoring for a specific job"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
@@ -720,6 +1305,7 @@ def start_job(job_id):
         api_key = data.get('api_key', API_KEY)
         
         success = job_manager.start_job(job_id, api_key)
+        admin_stats.invalidate()
         if not success:
             return jsonify({'error': 'Failed to start job'}), 400
         
@@ -727,7 +1313,7 @@ def start_job(job_id):
         return jsonify({
             'success': True,
             'message': f'Job "{job.name}" started successfully',
-            'job': asdict(job)
+            'job': job.to_dict()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -737,11 +1323,12 @@ def start_job(job_id):
 def stop_job(job_id):
     """Stop monitoring for a specific job"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
         success = job_manager.stop_job(job_id)
+        admin_stats.invalidate()
         if not success:
             return jsonify({'error': 'Failed to stop job'}), 400
         
@@ -749,7 +1336,7 @@ def stop_job(job_id):
         return jsonify({
             'success': True,
             'message': f'Job "{job.name}" stopped successfully',
-            'job': asdict(job)
+            'job': job.to_dict()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -759,11 +1346,12 @@ def stop_job(job_id):
 def pause_job(job_id):
     """Pause monitoring for a specific job"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
         success = job_manager.pause_job(job_id)
+        admin_stats.invalidate()
         if not success:
             return jsonify({'error': 'Job not found or not running'}), 400
         
@@ -771,7 +1359,7 @@ def pause_job(job_id):
         return jsonify({
             'success': True,
             'message': f'Job "{job.name}" paused successfully',
-            'job': asdict(job)
+            'job': job.to_dict()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -781,13 +1369,14 @@ def pause_job(job_id):
 def delete_job(job_id):
     """Delete a job and its results"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
         job = job_manager.get_job(job_id)
         job_name = job.name
         success = job_manager.delete_job(job_id)
+        admin_stats.invalidate()
         
         return jsonify({
             'success': True,
@@ -801,7 +1390,7 @@ def delete_job(job_id):
 def get_job_results(job_id):
     """Get results for a specific job"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
@@ -810,15 +1399,17 @@ def get_job_results(job_id):
         # Get limit from query parameters
         limit = request.args.get('limit', 50, type=int)
         
-        results = job_manager.get_job_results(job_id, limit)
+        results = job_manager.get_job_result_lines(job_id, limit)
         
-        return jsonify({
-            'success': True,
-            'job_id': job_id,
-            'job_name': job.name,
-            'results': results,
-            'total_results': len(results)
-        })
+        def generate():
+            # Records are stored as JSON already, so they are streamed out as-is
+            # instead of being decoded and re-encoded into one big buffer
+            yield b'{"success":true,"job_id":' + orjson.dumps(job_id) + b',"job_name":' + orjson.dumps(job.name) + b',"results":['
+            for i, record in enumerate(results):
+                yield b',' + record if i else record
+            yield b'],"total_results":' + str(len(results)).encode() + b'}'
+        
+        return Response(generate(), mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -827,7 +1418,7 @@ def get_job_results(job_id):
 def get_job_stats(job_id):
     """Get statistics for a specific job"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
+        user_id = g.user.user_id
         if not job_manager.user_owns_job(user_id, job_id):
             return jsonify({'error': 'Job not found or access denied'}), 404
         
@@ -848,18 +1439,19 @@ def get_job_stats(job_id):
 def get_user_status():
     """Get user-specific system status"""
     try:
-        user_id = getattr(request, 'current_user_id', session.get('user_id'))
-        user_jobs = job_manager.get_user_jobs(user_id)
+        user_id = g.user.user_id
+        total_jobs, total_changes = job_manager.get_user_totals(user_id)
+        status_counts = job_manager.get_status_counts(user_id)
         
         status = {
-            'total_jobs': len(user_jobs),
-            'running_jobs': len([j for j in user_jobs if j.status == 'running']),
-            'paused_jobs': len([j for j in user_jobs if j.status == 'paused']),
-            'stopped_jobs': len([j for j in user_jobs if j.status == 'stopped']),
-            'error_jobs': len([j for j in user_jobs if j.status == 'error']),
-            'total_changes_detected': sum(j.changes_detected for j in user_jobs),
+            'total_jobs': total_jobs,
+            'running_jobs': status_counts['running'],
+            'paused_jobs': status_counts['paused'],
+            'stopped_jobs': status_counts['stopped'],
+            'error_jobs': status_counts['error'],
+            'total_changes_detected': total_changes,
             'ai_enabled': API_KEY is not None,
-            'system_time': datetime.now().isoformat()
+            'system_time': clock.now()
         }
         
         return jsonify({
@@ -875,35 +1467,43 @@ def health_check():
     return jsonify({
         'success': True,
         'message': 'Web Change Monitor API is running',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': clock.now(),
         'authentication': 'enabled',
         'total_users': len(user_manager.users),
         'total_jobs': len(job_manager.jobs)
     })
 
 # Admin routes (optional - for system monitoring)
+def build_admin_stats() -> bytes:
+    """Encode the system-wide stats served by /api/admin/stats"""
+    total_jobs, total_changes = job_manager.get_totals()
+    
+    stats = {
+        'system': {
+            'total_users': len(user_manager.users),
+            'active_users': user_manager.active_count,
+            'total_jobs': total_jobs,
+            'running_jobs': job_manager.get_status_counts()['running'],
+            'total_changes': total_changes,
+        },
+        'ai_enabled': API_KEY is not None,
+        'uptime': clock.now()
+    }
+    
+    return orjson.dumps({
+        'success': True,
+        'stats': stats
+    })
+
+# Dashboards poll the admin stats; serve the encoded body for up to 10 seconds, and
+# rebuild it right away after users or jobs are added, removed, started or stopped
+admin_stats = CachedBody(build_admin_stats, ttl=10)
+
 @app.route('/api/admin/stats', methods=['GET'])
 def get_admin_stats():
     """Get overall system statistics (no auth required for basic stats)"""
     try:
-        all_jobs = job_manager.get_all_jobs()
-        
-        stats = {
-            'system': {
-                'total_users': len(user_manager.users),
-                'active_users': len([u for u in user_manager.users.values() if u.is_active]),
-                'total_jobs': len(all_jobs),
-                'running_jobs': len([j for j in all_jobs if j.status == 'running']),
-                'total_changes': sum(j.changes_detected for j in all_jobs),
-            },
-            'ai_enabled': API_KEY is not None,
-            'uptime': datetime.now().isoformat()
-        }
-        
-        return jsonify({
-            'success': True,
-            'stats': stats
-        })
+        return Response(admin_stats.get(), mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -914,25 +1514,31 @@ def api_latest_change():
     Query param: per_job=1 to get latest for each job.
     """
     per_job = request.args.get('per_job')
-    # Load jobs.json to get changes_detected count for each job
-    jobs_file = "jobs.json"
-    jobs_with_changes = set()
-    if os.path.exists(jobs_file):
-        with open(jobs_file, 'r', encoding='utf-8') as f:
-            jobs_data = json.load(f)
-            for job in jobs_data:
-                if job.get('changes_detected', 0) > 0:
-                    jobs_with_changes.add(job['job_id'])
+    
+    # Pollers send back the last ETag; if no results were written since, skip the file reads.
+    # Taken before reading, so a write that races with this request only costs a refetch
+    etag = f"{job_manager.results_etag()}-{'per-job' if per_job else 'latest'}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    # Use the in-memory job table for changes_detected instead of re-reading jobs.json per request
+    jobs_with_changes = {job.job_id for job in job_manager.get_all_jobs() if job.changes_detected > 0}
 
     if per_job:
         changes = get_latest_changes_per_job()
         # Only include jobs with changes_detected > 0
         filtered = [c for c in changes if c['job_id'] in jobs_with_changes]
-        return jsonify({'success': True, 'latest_changes': filtered})
+        response = jsonify({'success': True, 'latest_changes': filtered})
+        response.set_etag(etag)
+        return response
     else:
         change = get_latest_change()
         if change and change['job_id'] in jobs_with_changes:
-            return jsonify({'success': True, 'latest_change': change})
+            response = jsonify({'success': True, 'latest_change': change})
+            response.set_etag(etag)
+            return response
         else:
             return jsonify({'success': False, 'message': 'No changes found'}), 404
 
@@ -941,7 +1547,7 @@ if __name__ == '__main__':
     print("=============================================")
     print("🔧 Features:")
     print("  - User registration & authentication")
-    print("  - SHA-256 password hashing")
+    print("  - Argon2id password hashing")
     print("  - Session-based authentication")
     print("  - User-specific job isolation")
     print("  - Create monitoring jobs with custom intervals")
@@ -958,6 +1564,9 @@ if __name__ == '__main__':
     print("")
     print("📡 Job Management Endpoints (Auth Required):")
     print("  POST   /api/jobs                 - Create new job")
+    print("  POST   /api/jobs/bulk            - Create many jobs at once")
+    print("  POST   /api/jobs/batch_start     - Start many jobs at once")
+    print("  POST   /api/jobs/batch_stop      - Stop many jobs at once")
     print("  GET    /api/jobs                 - Get user's jobs")
     print("  GET    /api/jobs/<id>            - Get job details")
     print("  POST   /api/jobs/<id>/start      - Start job")
@@ -1017,16 +1626,31 @@ if __name__ == '__main__':
     print("   Test with: curl http://localhost:5000/api/health")
     print("   Press Ctrl+C to stop")
     
+    def handle_sigterm(signum, frame):
+        # Take the same graceful path as Ctrl+C
+        raise KeyboardInterrupt
+    
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
     try:
-        app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
+        try:
+            # Production WSGI server when available; jobs live in this process, so
+            # it runs one process with a thread per in-flight request
+            from waitress import serve
+            print(f"   Serving with waitress ({WEB_THREADS} threads)")
+            serve(app, host='0.0.0.0', port=5000, threads=WEB_THREADS)
+        except ImportError:
+            print("   waitress not installed, using the Flask server (pip install waitress)")
+            app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
     except KeyboardInterrupt:
-        print("\n🛑 Shutting down...")
-        # Stop all running jobs
-        for job_id in list(job_manager.jobs.keys()):
-            if job_manager.jobs[job_id].status == 'running':
-                job_manager.stop_job(job_id)
-        print("✅ All jobs stopped. Goodbye!")
+        # The Flask server raises on Ctrl+C; waitress handles it and returns from serve()
+        pass
     except Exception as e:
         logger.error(f"Error starting server: {e}")
         print(f"❌ Server failed to start: {e}")
         print("💡 Make sure port 5000 is available and webmonitor.py exists")
+    finally:
+        print("\n🛑 Shutting down...")
+        # Stop all running jobs
+        job_manager.shutdown()
+        print("✅ All jobs stopped. Goodbye!")
@@ -1,11 +1,9 @@
 # API Key Authentication Example
 from flask import Flask, request, jsonify
 from functools import wraps
-import secrets
 
-# Add to User class - generate API key for each user
-def generate_api_key():
-    return secrets.token_urlsafe(32)
+# API keys are stored on User.api_key and indexed by UserManager;
+# issue or rotate one with user_manager.assign_api_key(user_id)
 
 def require_api_key(f):
     @wraps(f)
@@ -15,12 +13,8 @@ def require_api_key(f):
         if not api_key:
             return jsonify({'error': 'API key required'}), 401
         
-        # Find user by API key
-        user = None
-        for u in user_manager.users.values():
-            if hasattr(u, 'api_key') and u.api_key == api_key:
-                user = u
-                break
+        # Find user by API key (one dict lookup instead of a scan over all users)
+        user = user_manager.get_user_by_api_key(api_key)
         
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid API key'}), 401
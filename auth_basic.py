@@ -2,6 +2,38 @@
 from flask import Flask, request, jsonify
 from functools import wraps
 import base64
+import hashlib
+import time
+
+# Verifying a password hash on every request is expensive, so a successful login is
+# remembered for a short while, keyed by a digest of the header (never the password itself)
+BASIC_AUTH_TTL = 30  # seconds
+BASIC_AUTH_CACHE_SIZE = 1024
+_basic_auth_cache = {}  # sha256(header) -> (expires_at, user_id)
+
+def _authenticate_basic(auth_header):
+    """Resolve a Basic Authorization header to a user, reusing a recent successful check"""
+    key = hashlib.sha256(auth_header.encode()).digest()
+    cached = _basic_auth_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        user = user_manager.get_user(cached[1])
+        # Deactivated users lose access without waiting for the entry to expire
+        return user if user and user.is_active else None
+    
+    # Decode base64 credentials
+    credentials = base64.b64decode(auth_header[6:]).decode('utf-8')
+    email, password = credentials.split(':', 1)
+    
+    # Authenticate user
+    user = user_manager.authenticate_user(email, password)
+    if user:
+        if len(_basic_auth_cache) >= BASIC_AUTH_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            _basic_auth_cache.pop(next(iter(_basic_auth_cache)), None)
+        _basic_auth_cache[key] = (time.monotonic() + BASIC_AUTH_TTL, user.user_id)
+    else:
+        _basic_auth_cache.pop(key, None)
+    return user
 
 def require_basic_auth(f):
     @wraps(f)
@@ -12,12 +44,7 @@ def require_basic_auth(f):
             return jsonify({'error': 'Basic authentication required'}), 401
         
         try:
-            # Decode base64 credentials
-            credentials = base64.b64decode(auth_header[6:]).decode('utf-8')
-            email, password = credentials.split(':', 1)
-            
-            # Authenticate user
-            user = user_manager.authenticate_user(email, password)
+            user = _authenticate_basic(auth_header)
             if not user:
                 return jsonify({'error': 'Invalid credentials'}), 401
             
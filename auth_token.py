@@ -6,10 +6,9 @@ def require_token_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         # Get token from header or query parameter
-        token = request.headers.get('Authorization')
-        if token and token.startswith('Bearer '):
-            token = token[7:]  # Remove 'Bearer ' prefix
-        else:
+        # One split of the header yields both the scheme and the token
+        scheme, sep, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme != 'Bearer' or not sep:
             token = request.headers.get('X-User-Token') or request.args.get('token')
         
         if not token:
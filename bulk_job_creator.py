@@ -1,9 +1,12 @@
 import pandas as pd
 import requests
 import json
-import time
+import re
 from typing import Optional
 
+# URLs that already carry a scheme; anything else gets https:// prepended
+URL_SCHEME_PATTERN = re.compile(r'https?://')
+
 class JobCreator:
     def __init__(self, base_url: str = "http://localhost:5000"):
         self.base_url = base_url
@@ -76,6 +79,42 @@ class JobCreator:
             print(f"❌ Error creating job: {e}")
             return None
     
+    def create_jobs_bulk(self, jobs: list, check_interval_minutes: int) -> Optional[dict]:
+        """Create many monitoring jobs with one request to the bulk endpoint"""
+        try:
+            bulk_url = f"{self.base_url}/api/jobs/bulk"
+            payload = {
+                "jobs": [
+                    {
+                        "name": job['name'],
+                        "url": job['url'],
+                        "check_interval_minutes": check_interval_minutes
+                    }
+                    for job in jobs
+                ]
+            }
+            
+            # Add authentication header
+            headers = {
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/json"
+            }
+            
+            print(f"📝 Creating {len(jobs)} jobs in one request")
+            
+            response = self.session.post(bulk_url, json=payload, headers=headers)
+            
+            if response.status_code == 201:
+                return response.json()
+            else:
+                error_msg = response.json().get('error', 'Unknown error')
+                print(f"❌ Failed to create jobs: {error_msg}")
+                return None
+                
+        except Exception as e:
+            print(f"❌ Error creating jobs: {e}")
+            return None
+    
     def load_jobs_from_excel(self, excel_file: str) -> list:
         """Load job data from Excel file"""
         try:
@@ -92,31 +131,31 @@ class JobCreator:
             print("\n📑 First few rows:")
             print(df.head())
             
-            # Extract job data (skip header row, start from index 1)
-            jobs = []
-            for index, row in df.iterrows():
-                # Skip header row (index 0)
-                if index == 0:
-                    continue
-                    
-                # Get URL from first column and job name from second column
-                url = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ""
-                job_name = str(row.iloc[1]).strip() if pd.notna(row.iloc[1]) else f"Job {index}"
-                
-                # Skip empty URLs
-                if not url or url.lower() in ['nan', 'none', '']:
-                    print(f"⚠️  Skipping row {index + 1}: Empty URL")
-                    continue
-                
-                # Add http:// if no protocol specified
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
-                
-                jobs.append({
-                    'name': job_name,
-                    'url': url,
-                    'row': index + 1
-                })
+            # Extract job data (skip header row, start from index 1), one column at a time
+            rows = df.iloc[1:]
+            raw_urls = rows.iloc[:, 0]
+            raw_names = rows.iloc[:, 1]
+            
+            # URL from the first column and job name from the second column
+            urls = raw_urls.where(raw_urls.notna(), '').astype(str).str.strip()
+            names = raw_names.astype(str).str.strip().where(
+                raw_names.notna(), pd.Series('Job ' + rows.index.astype(str), index=rows.index)
+            )
+            
+            # Skip empty URLs
+            valid = ~urls.str.lower().isin(['nan', 'none', ''])
+            for index in rows.index[~valid]:
+                print(f"⚠️  Skipping row {index + 1}: Empty URL")
+            urls = urls[valid]
+            
+            # Add https:// if no protocol specified
+            has_scheme = urls.str.match(URL_SCHEME_PATTERN, na=False)
+            urls = urls.where(has_scheme, 'https://' + urls)
+            
+            jobs = [
+                {'name': name, 'url': url, 'row': index + 1}
+                for index, name, url in zip(urls.index, names[valid], urls)
+            ]
             
             print(f"\n✅ Loaded {len(jobs)} valid jobs from Excel file")
             return jobs
@@ -142,26 +181,20 @@ class JobCreator:
             print("❌ No jobs to create")
             return
         
-        # Create each job
+        # Create all jobs with a single request
         created_jobs = []
         failed_jobs = []
         
-        for i, job in enumerate(jobs, 1):
-            print(f"\n🔄 Processing job {i}/{len(jobs)} (Row {job['row']})")
-            
-            job_id = self.create_job(
-                name=job['name'],
-                url=job['url'],
-                check_interval_minutes=check_interval_minutes
-            )
-            
-            if job_id:
-                created_jobs.append({**job, 'job_id': job_id})
-            else:
+        result = self.create_jobs_bulk(jobs, check_interval_minutes)
+        if result is None:
+            failed_jobs = list(jobs)
+        else:
+            for created in result['created']:
+                created_jobs.append({**jobs[created['index']], 'job_id': created['job_id']})
+            for error in result['errors']:
+                job = jobs[error['index']]
+                print(f"❌ Row {job['row']}: {error['error']}")
                 failed_jobs.append(job)
-            
-            # Small delay between requests
-            time.sleep(1)
         
         # Summary
         print("\n" + "=" * 60)
@@ -0,0 +1,67 @@
+"""Helpers shared by the command-line API clients (simple_job_creator.py, start_all_jobs.py, fetchdata.py, test_auth.py)"""
+
+import os
+import sys
+import getpass
+from pathlib import Path
+
+try:
+    # orjson encodes and decodes large bodies several times faster than the stdlib
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:
+    import json
+    json_loads = json.loads
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# (connect, read) seconds for every API call, so a hung server can't stall the run
+REQUEST_TIMEOUT = (5, 30)
+# Large bodies are pre-encoded with json_dumps, so the content type is set by hand
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Per-job progress lines are buffered and written this many at a time
+PROGRESS_BATCH = 50
+
+# Logins are saved here between runs so the password isn't needed (or verified) every time
+TOKEN_CACHE_PATH = Path.home() / '.pingvisual' / 'token.json'
+
+def write_lines(lines: list):
+    """Write buffered progress lines to stdout in one call and empty the buffer"""
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
+        lines.clear()
+
+def error_message(response) -> str:
+    """The API's "error" field, or the start of the raw body when it isn't JSON (e.g. a proxy error page)"""
+    try:
+        return json_loads(response.content).get('error', 'Unknown error')
+    except (ValueError, AttributeError):
+        return response.text[:200].strip() or f"HTTP {response.status_code}"
+
+def load_cached_tokens() -> dict:
+    """Saved logins by server URL, or {} if there are none"""
+    try:
+        return json_loads(TOKEN_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def save_cached_token(base_url: str, token: str, user_id: str):
+    """Remember a login for base_url in a file only the current user can read"""
+    tokens = load_cached_tokens()
+    tokens[base_url] = {"token": token, "user_id": user_id}
+    try:
+        TOKEN_CACHE_PATH.parent.mkdir(mode=0o700, exist_ok=True)
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode above only applies when the file is created; tighten an older, wider one too
+        os.chmod(TOKEN_CACHE_PATH, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json_dumps(tokens))
+    except OSError as e:
+        print(f"⚠️  Could not save login to {TOKEN_CACHE_PATH}: {e}")
+
+def get_credentials() -> tuple:
+    """Email and password from PINGVISUAL_EMAIL / PINGVISUAL_PASSWORD, prompting for any that are unset"""
+    email = os.getenv('PINGVISUAL_EMAIL') or input("Email: ").strip()
+    password = os.getenv('PINGVISUAL_PASSWORD') or getpass.getpass("Password: ")
+    return email, password
@@ -1,11 +1,33 @@
 import requests
+from requests.adapters import HTTPAdapter
+from client_common import REQUEST_TIMEOUT
 
 url = "http://209.74.95.163:5000/api/changes/latest"  # Change this to your desired URL
 
-response = requests.get(url)
-if response.status_code == 200:
-    print("Success!")
-    print(response.json())
-else:
-    print(f"Failed with status code: {response.status_code}")
-    print(response.text)
\ No newline at end of file
+# One keep-alive session, so repeated polls reuse the connection instead of reconnecting
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+session.mount('http://', adapter)
+session.mount('https://', adapter)
+
+# Last ETag seen per URL; the server answers 304 Not Modified while nothing has changed
+_etags = {}
+
+def fetch_latest(url: str = url):
+    """GET the latest-change endpoint over the shared session (304 if unchanged since the last call)"""
+    headers = {'If-None-Match': _etags[url]} if url in _etags else {}
+    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if 'ETag' in response.headers:
+        _etags[url] = response.headers['ETag']
+    return response
+
+if __name__ == "__main__":
+    response = fetch_latest()
+    if response.status_code == 200:
+        print("Success!")
+        print(response.json())
+    elif response.status_code == 304:
+        print("No new changes since the last poll")
+    else:
+        print(f"Failed with status code: {response.status_code}")
+        print(response.text)
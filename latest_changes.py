@@ -1,6 +1,16 @@
 import os
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from results_log import RESULTS_EXT, read_latest_result
+
+# Reads the tails of many results logs at once; threads are started on first use
+_reader_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="results-read")
+
+def _results_entries(results_dir):
+    """Yield (job_id, DirEntry) for every results log, streaming the directory listing"""
+    with os.scandir(results_dir) as it:
+        for entry in it:
+            if entry.name.endswith(RESULTS_EXT) and entry.is_file():
+                yield entry.name[:-len(RESULTS_EXT)], entry
 
 def get_latest_change(results_dir="results"):
     """
@@ -10,27 +20,21 @@ def get_latest_change(results_dir="results"):
     latest_file = None
     latest_job_id = None
     latest_time = None
-    for fname in os.listdir(results_dir):
-        if not fname.endswith('.json'):
-            continue
-        job_id = fname.replace('.json', '')
-        fpath = os.path.join(results_dir, fname)
+    # Every log is read: a file's mtime says nothing reliable about the detected_at
+    # stored in its records (copies, restores and clock changes all break the link)
+    for job_id, entry in _results_entries(results_dir):
         try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                changes = json.load(f)
-                if not changes:
-                    continue
-                # Find the most recent change in this file
-                for change in changes[::-1]:  # reverse for efficiency
-                    detected_at = change.get('detected_at')
-                    if detected_at:
-                        dt = datetime.fromisoformat(detected_at)
-                        if latest_time is None or dt > latest_time:
-                            latest = change
-                            latest_file = fname
-                            latest_job_id = job_id
-                            latest_time = dt
-                        break  # Only need the latest per file
+            # Records are appended in order, so the newest change is the last one
+            change = read_latest_result(entry.path)
+            if not change:
+                continue
+            detected_at = change.get('detected_at')
+            # detected_at is local-time ISO 8601 throughout, so string order is time order
+            if detected_at and (latest_time is None or detected_at > latest_time):
+                latest = change
+                latest_file = entry.name
+                latest_job_id = job_id
+                latest_time = detected_at
         except Exception as e:
             continue
     if latest:
@@ -42,30 +46,30 @@ def get_latest_change(results_dir="results"):
         }
     return None
 
+def _load_latest(item):
+    """Latest change record for one (job_id, DirEntry) results log, or None"""
+    job_id, entry = item
+    try:
+        # Only the last line of the log is read and parsed
+        latest = read_latest_result(entry.path)
+    except Exception:
+        return None
+    if not latest:
+        return None
+    return {
+        'job_id': job_id,
+        'results_file': entry.name,
+        'change': latest,
+        'detected_at': latest.get('detected_at')
+    }
+
 def get_latest_changes_per_job(results_dir="results"):
     """
     Returns the latest change for each job as a list.
     """
-    latest_changes = []
-    for fname in os.listdir(results_dir):
-        if not fname.endswith('.json'):
-            continue
-        job_id = fname.replace('.json', '')
-        fpath = os.path.join(results_dir, fname)
-        try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                changes = json.load(f)
-                if not changes:
-                    continue
-                latest = changes[-1]
-                latest_changes.append({
-                    'job_id': job_id,
-                    'results_file': fname,
-                    'change': latest,
-                    'detected_at': latest.get('detected_at')
-                })
-        except Exception as e:
-            continue
+    # Logs are read in parallel so their disk reads overlap
+    loaded = _reader_pool.map(_load_latest, list(_results_entries(results_dir)))
+    latest_changes = [change for change in loaded if change]
     # Sort by detected_at descending
     latest_changes.sort(key=lambda x: x.get('detected_at') or '', reverse=True)
     return latest_changes
@@ -0,0 +1,180 @@
+import os
+import queue
+import logging
+import threading
+import orjson
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-job results are stored as an append-only JSON Lines log: one change per line.
+RESULTS_EXT = '.jsonl'
+LEGACY_RESULTS_EXT = '.json'
+
+# Readers only ever see the newest MAX_RESULTS records
+MAX_RESULTS = 200
+
+# Rewrite a log down to its newest MAX_RESULTS records once it holds more than this many lines
+COMPACT_THRESHOLD_LINES = 2 * MAX_RESULTS
+
+# Block size used when reading a log backwards from the end
+TAIL_CHUNK_SIZE = 8192
+
+def results_path(results_dir: str, job_id: str) -> str:
+    """Path of the results log for a job"""
+    return os.path.join(results_dir, f"{job_id}{RESULTS_EXT}")
+
+def append_results(path: str, records: Iterable[dict]):
+    """Append records to a results log with a single write"""
+    payload = b''.join(orjson.dumps(record) + b'\n' for record in records)
+    with open(path, 'ab') as f:
+        f.write(payload)
+
+def _parse_lines(lines: Iterable[bytes]) -> List[dict]:
+    records = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            # Torn write at the end of the log; skip it
+            continue
+    return records
+
+def _tail_lines(path: str, count: int) -> List[bytes]:
+    """Return the last `count` lines of a file, reading backwards from EOF in chunks"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b''
+        # One newline more than needed guarantees the first kept line is complete
+        while position > 0 and buffer.count(b'\n') <= count:
+            step = min(TAIL_CHUNK_SIZE, position)
+            position -= step
+            f.seek(position)
+            buffer = f.read(step) + buffer
+    lines = buffer.splitlines(keepends=True)
+    return lines[-count:]
+
+def read_results(path: str, limit: Optional[int] = None) -> List[dict]:
+    """Read the newest `limit` records (all retained records if no limit), oldest first"""
+    count = min(limit, MAX_RESULTS) if limit else MAX_RESULTS
+    # Only the tail of the log is read and parsed
+    return _parse_lines(_tail_lines(path, count))
+
+def read_latest_result(path: str) -> Optional[dict]:
+    """Newest record of a results log, or None if it is empty; reads only the end of the file"""
+    # Two lines, so a torn write at the very end still leaves the record before it
+    records = _parse_lines(_tail_lines(path, 2))
+    return records[-1] if records else None
+
+def read_result_lines(path: str, limit: Optional[int] = None) -> List[bytes]:
+    """Like read_results, but return each record's raw JSON bytes for passing straight to a response"""
+    count = min(limit, MAX_RESULTS) if limit else MAX_RESULTS
+    lines = []
+    for line in _tail_lines(path, count):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            # Validate only; the original bytes are what gets sent
+            orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        lines.append(line)
+    return lines
+
+def compact_results(path: str, keep: int = MAX_RESULTS):
+    """Rewrite a results log keeping only its newest `keep` records"""
+    tail = _tail_lines(path, keep)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.writelines(tail)
+    os.replace(tmp_path, path)
+
+def count_lines(path: str) -> int:
+    """Number of records in a results log (0 if it does not exist)"""
+    try:
+        with open(path, 'rb') as f:
+            return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(65536), b''))
+    except FileNotFoundError:
+        return 0
+
+def migrate_legacy_results(results_dir: str) -> int:
+    """Convert legacy `{job_id}.json` result arrays into JSON Lines logs"""
+    migrated = 0
+    for fname in os.listdir(results_dir):
+        if not fname.endswith(LEGACY_RESULTS_EXT):
+            continue
+        legacy_path = os.path.join(results_dir, fname)
+        job_id = fname[:-len(LEGACY_RESULTS_EXT)]
+        with open(legacy_path, 'rb') as f:
+            records = orjson.loads(f.read()) or []
+        new_path = results_path(results_dir, job_id)
+        tmp_path = new_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(orjson.dumps(record) + b'\n' for record in records[-MAX_RESULTS:]))
+        os.replace(tmp_path, new_path)
+        os.remove(legacy_path)
+        migrated += 1
+    return migrated
+
+class ResultsWriter:
+    """Background writer that batches result appends from all jobs"""
+    def __init__(self, on_write=None):
+        self.on_write = on_write  # Called with the path after each append
+        self._queue = queue.Queue()
+        self._line_counts = {}  # path -> lines in the log, tracked to trigger compaction
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, path: str, records: Iterable[dict]):
+        """Queue records to be appended to a results log"""
+        self._queue.put((path, list(records)))
+    
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+    
+    def _run(self):
+        while True:
+            # Take everything queued so far and write it as one append per file
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            by_path = {}
+            for path, records in batch:
+                by_path.setdefault(path, []).extend(records)
+            
+            for path, records in by_path.items():
+                try:
+                    self._append(path, records)
+                except Exception as e:
+                    logger.error(f"Error writing results to {path}: {e}")
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    def _append(self, path: str, records: List[dict]):
+        """Append records and compact the log once it passes the line threshold"""
+        lines = self._line_counts.get(path)
+        if lines is None:
+            lines = count_lines(path)
+        append_results(path, records)
+        lines += len(records)
+        if lines > COMPACT_THRESHOLD_LINES:
+            compact_results(path)
+            lines = min(lines, MAX_RESULTS)
+        self._line_counts[path] = lines
+        if self.on_write:
+            self.on_write(path)
+    
+    def forget(self, path: str):
+        """Drop the tracked line count for a log that was deleted"""
+        self._line_counts.pop(path, None)
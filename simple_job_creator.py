@@ -1,16 +1,77 @@
 import openpyxl
 import requests
-import json
 import time
+import random
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from client_common import (
+    json_loads, json_dumps, REQUEST_TIMEOUT, JSON_HEADERS, PROGRESS_BATCH,
+    write_lines, error_message, load_cached_tokens, save_cached_token, get_credentials,
+)
+
+# Responses that mean "slow down and try again" rather than a real failure
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 5
+RETRY_BACKOFF = 1.0  # seconds; doubles per attempt, plus up to this much jitter
+RETRY_BACKOFF_MAX = 30
+
+# Bulk requests do the work of many calls, so they get a longer read timeout
+BATCH_TIMEOUT = (5, 120)
+
+# Cell values treated as "no URL" when reading the sheet
+EMPTY_URLS = frozenset({'none', 'nan'})
+HTTP_PREFIXES = ('http://', 'https://')
+
+# Job creation requests in flight at once
+CREATE_WORKERS = 16
 
 class SimpleJobCreator:
     def __init__(self, base_url: str = "http://localhost:5000"):
         self.base_url = base_url
         self.session = requests.Session()
+        # Enough pooled connections for every worker to keep its own alive. Failed
+        # connects are retried for any request; 429/5xx answers only for idempotent
+        # ones (GET), so a POST that may have been applied is never sent twice
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=CREATE_WORKERS,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=RETRY_BACKOFF,
+                backoff_max=RETRY_BACKOFF_MAX,
+                backoff_jitter=RETRY_BACKOFF,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.token = None
         self.user_id = None
         
+    def login_cached(self) -> bool:
+        """Reuse a login saved by an earlier run, if the server still accepts its token"""
+        cached = load_cached_tokens().get(self.base_url)
+        if not cached:
+            return False
+        
+        self.session.headers['Authorization'] = f"Bearer {cached['token']}"
+        try:
+            response = self.session.get(f"{self.base_url}/api/auth/profile", timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                self.token = cached['token']
+                self.user_id = cached['user_id']
+                print(f"✅ Using saved login for {json_loads(response.content)['user']['email']}")
+                return True
+        except Exception as e:
+            print(f"⚠️  Could not check saved login: {e}")
+        
+        del self.session.headers['Authorization']
+        return False
+    
     def login(self, email: str, password: str) -> bool:
         """Login to the API and get authentication token"""
         try:
@@ -21,26 +82,44 @@ class SimpleJobCreator:
             }
             
             print(f"🔐 Logging in with email: {email}")
-            response = self.session.post(login_url, json=login_data)
+            response = self.session.post(login_url, json=login_data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 self.token = data['token']
                 self.user_id = data['user']['user_id']
+                # Every later request carries the token without building a headers dict
+                self.session.headers['Authorization'] = f"Bearer {self.token}"
+                save_cached_token(self.base_url, self.token, self.user_id)
                 print(f"✅ Login successful!")
                 print(f"   User ID: {self.user_id}")
                 print(f"   Email: {data['user']['email']}")
                 return True
             else:
-                print(f"❌ Login failed: {response.json().get('error', 'Unknown error')}")
+                print(f"❌ Login failed: {error_message(response)}")
                 return False
                 
         except Exception as e:
             print(f"❌ Login error: {e}")
             return False
     
-    def create_job(self, name: str, url: str, check_interval_minutes: int) -> Optional[str]:
-        """Create a monitoring job"""
+    def _post_with_retry(self, url: str, **kwargs) -> requests.Response:
+        """POST, waiting only when the server asks for it (429/503), honoring Retry-After"""
+        for attempt in range(MAX_RETRIES):
+            response = self.session.post(url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES - 1:
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                # Jitter keeps the concurrent workers from all retrying at the same instant
+                delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt) + random.uniform(0, RETRY_BACKOFF)
+            print(f"⏳ Server busy ({response.status_code}), retrying in {delay:.0f}s")
+            time.sleep(delay)
+    
+    def create_job(self, name: str, url: str, check_interval_minutes: int, verbose: bool = True) -> Optional[str]:
+        """Create a monitoring job (verbose=False prints only errors, for concurrent use)"""
         try:
             jobs_url = f"{self.base_url}/api/jobs"
             job_data = {
@@ -49,81 +128,120 @@ class SimpleJobCreator:
                 "check_interval_minutes": check_interval_minutes
             }
             
-            # Add authentication header
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            
-            print(f"📝 Creating job: {name}")
-            print(f"   URL: {url}")
-            print(f"   Interval: {check_interval_minutes} minutes ({check_interval_minutes/60:.1f} hours)")
+            if verbose:
+                print(f"📝 Creating job: {name}")
+                print(f"   URL: {url}")
+                print(f"   Interval: {check_interval_minutes} minutes ({check_interval_minutes/60:.1f} hours)")
             
-            response = self.session.post(jobs_url, json=job_data, headers=headers)
+            response = self._post_with_retry(jobs_url, json=job_data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 201:
-                data = response.json()
+                data = json_loads(response.content)
                 job_id = data['job_id']
-                print(f"✅ Job created successfully!")
-                print(f"   Job ID: {job_id}")
+                if verbose:
+                    print(f"✅ Job created successfully!")
+                    print(f"   Job ID: {job_id}")
                 return job_id
             else:
-                error_msg = response.json().get('error', 'Unknown error')
-                print(f"❌ Failed to create job: {error_msg}")
+                error_msg = error_message(response)
+                print(f"❌ Failed to create job {name}: {error_msg}")
                 return None
                 
         except Exception as e:
-            print(f"❌ Error creating job: {e}")
+            print(f"❌ Error creating job {name}: {e}")
             return None
     
+    def create_jobs_batch(self, jobs: list, check_interval_minutes: int) -> Optional[tuple]:
+        """Create all jobs with one /api/jobs/bulk request; returns (created, failed), or None if the server lacks it"""
+        bulk_url = f"{self.base_url}/api/jobs/bulk"
+        payload = {
+            "jobs": [
+                {"name": job['name'], "url": job['url'], "check_interval_minutes": check_interval_minutes}
+                for job in jobs
+            ]
+        }
+        try:
+            response = self._post_with_retry(bulk_url, data=json_dumps(payload), headers=JSON_HEADERS,
+                                             timeout=BATCH_TIMEOUT)
+        except Exception as e:
+            # Not retried job by job: the server may already have created them
+            print(f"❌ Error creating jobs in bulk: {e}")
+            return [], list(jobs)
+        
+        if response.status_code in (404, 405):
+            # Older server without the bulk endpoint: nothing was created, so go job by job
+            return None
+        # Anything else is not retried job by job either: some jobs may already exist
+        if response.status_code != 201:
+            print(f"❌ Bulk create failed ({error_message(response)}); some jobs may have been created, "
+                  "check the server before re-running")
+            return [], list(jobs)
+        try:
+            data = json_loads(response.content)
+        except ValueError:
+            print("❌ Bulk create response was not JSON; jobs may have been created, check the server before re-running")
+            return [], list(jobs)
+        
+        # Results refer to jobs by their position in the request
+        created_jobs = []
+        failed_jobs = []
+        progress = []
+        for done, item in enumerate(data['created'], 1):
+            job = {**jobs[item['index']], 'job_id': item['job_id']}
+            created_jobs.append(job)
+            progress.append(f"✅ [{done}/{len(jobs)}] Row {job['row']}: {job['name']} (ID: {job['job_id']})")
+        for item in data['errors']:
+            job = jobs[item['index']]
+            failed_jobs.append(job)
+            progress.append(f"❌ Row {job['row']}: {job['name']}: {item['error']}")
+        write_lines(progress)
+        return created_jobs, failed_jobs
+    
     def load_jobs_from_excel(self, excel_file: str) -> list:
         """Load job data from Excel file using openpyxl"""
         try:
             print(f"📊 Reading Excel file: {excel_file}")
             
-            # Load workbook
-            workbook = openpyxl.load_workbook(excel_file)
+            # Read-only mode streams rows instead of building the whole sheet in memory
+            workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
             sheet = workbook.active
             
             print(f"📋 Excel file loaded successfully!")
             print(f"   Sheet name: {sheet.title}")
-            print(f"   Total rows: {sheet.max_row}")
-            print(f"   Total columns: {sheet.max_column}")
             
             # Read headers (first row)
-            headers = []
-            for col in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row=1, column=col).value
-                headers.append(str(cell_value) if cell_value else f"Column_{col}")
+            header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            headers = [str(value) if value else f"Column_{col}" for col, value in enumerate(header_row, 1)]
             
             print(f"   Headers: {headers}")
             
-            # Extract job data (skip header row, start from row 2)
+            # Extract job data (skip header row, start from row 2): URL in column A, name in column B
             jobs = []
-            for row_num in range(2, sheet.max_row + 1):
-                # Get URL from first column (column A)
-                url_cell = sheet.cell(row=row_num, column=1).value
+            skipped_rows = []
+            rows = sheet.iter_rows(min_row=2, max_col=2, values_only=True)
+            for row_num, (url_cell, name_cell) in enumerate(rows, start=2):
                 url = str(url_cell).strip() if url_cell else ""
                 
-                # Get job name from second column (column B)
-                name_cell = sheet.cell(row=row_num, column=2).value
-                job_name = str(name_cell).strip() if name_cell else f"Job Row {row_num}"
-                
-                # Skip empty URLs
-                if not url or url.lower() in ['none', 'nan', '']:
-                    print(f"⚠️  Skipping row {row_num}: Empty URL")
+                # Skip empty URLs (reported together after the loop)
+                if not url or url.lower() in EMPTY_URLS:
+                    skipped_rows.append(row_num)
                     continue
                 
-                # Add http:// if no protocol specified
-                if not url.startswith(('http://', 'https://')):
+                # Add https:// if no protocol specified
+                if not url.startswith(HTTP_PREFIXES):
                     url = 'https://' + url
                 
                 jobs.append({
-                    'name': job_name,
+                    'name': str(name_cell).strip() if name_cell else f"Job Row {row_num}",
                     'url': url,
                     'row': row_num
                 })
             
+            if skipped_rows:
+                shown = ', '.join(map(str, skipped_rows[:10]))
+                more = f" and {len(skipped_rows) - 10} more" if len(skipped_rows) > 10 else ""
+                print(f"⚠️  Skipped {len(skipped_rows)} rows with an empty URL: {shown}{more}")
+            
             workbook.close()
             print(f"\n✅ Loaded {len(jobs)} valid jobs from Excel file")
             
@@ -164,26 +282,38 @@ class SimpleJobCreator:
             print("❌ Operation cancelled")
             return
         
-        # Create each job
-        created_jobs = []
-        failed_jobs = []
-        
-        for i, job in enumerate(jobs, 1):
-            print(f"\n🔄 Processing job {i}/{len(jobs)} (Row {job['row']})")
+        # One bulk request when the server supports it
+        result = self.create_jobs_batch(jobs, check_interval_minutes)
+        if result is not None:
+            created_jobs, failed_jobs = result
+        else:
+            # Older server: create jobs concurrently over the shared session; results are
+            # collected here, on the main thread, as each request finishes
+            created_jobs = []
+            failed_jobs = []
+            progress = []
             
-            job_id = self.create_job(
-                name=job['name'],
-                url=job['url'],
-                check_interval_minutes=check_interval_minutes
-            )
-            
-            if job_id:
-                created_jobs.append({**job, 'job_id': job_id})
-            else:
-                failed_jobs.append(job)
-            
-            # Small delay between requests
-            time.sleep(1)
+            with ThreadPoolExecutor(max_workers=CREATE_WORKERS) as executor:
+                futures = {
+                    executor.submit(self.create_job, job['name'], job['url'], check_interval_minutes, False): job
+                    for job in jobs
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    job = futures[future]
+                    job_id = future.result()
+                    if job_id:
+                        created_jobs.append({**job, 'job_id': job_id})
+                        progress.append(f"✅ [{done}/{len(jobs)}] Row {job['row']}: {job['name']} (ID: {job_id})")
+                    else:
+                        failed_jobs.append(job)
+                        progress.append(f"❌ [{done}/{len(jobs)}] Row {job['row']}: {job['name']}")
+                    if len(progress) >= PROGRESS_BATCH:
+                        write_lines(progress)
+            write_lines(progress)
+        
+        # Report in spreadsheet order, not completion order
+        created_jobs.sort(key=lambda job: job['row'])
+        failed_jobs.sort(key=lambda job: job['row'])
         
         # Summary
         print("\n" + "=" * 60)
@@ -212,16 +342,14 @@ def main():
     print("=" * 60)
     
     # Configuration
-    EMAIL = "faizalmohamed.vi@gmail.com"
-    PASSWORD = "Faizal@123"
     EXCEL_FILE = "job-settings.xlsx"
     CHECK_INTERVAL_HOURS = 8  # Check every 8 hours
     
     # Create job creator instance
     creator = SimpleJobCreator()
     
-    # Login
-    if not creator.login(EMAIL, PASSWORD):
+    # Login, reusing the saved token from an earlier run when it's still valid
+    if not creator.login_cached() and not creator.login(*get_credentials()):
         print("❌ Cannot proceed without login. Exiting...")
         return
     
@@ -1,15 +1,78 @@
 import requests
-import json
 import time
-from typing import List, Dict
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from client_common import (
+    json_loads, json_dumps, REQUEST_TIMEOUT, JSON_HEADERS, PROGRESS_BATCH,
+    write_lines, error_message, load_cached_tokens, save_cached_token, get_credentials,
+)
+
+# Start/stop requests in flight at once; bounded so the server isn't flooded
+BULK_WORKERS = 20
+
+# Transient failures (network errors, 429/5xx) are retried with exponential backoff
+# plus random jitter, so a burst of failures doesn't retry in lockstep
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0  # seconds; doubles per attempt
+RETRY_BACKOFF_MAX = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Batch requests do the work of many calls, so they get a longer read timeout
+BATCH_TIMEOUT = (5, 60)
+# Every job status other than 'running', for asking the server only for jobs to start
+NOT_RUNNING_STATUSES = "created,stopped,paused,error"
+
+# Wall-clock budget for one bulk start/stop; jobs not reached by then are skipped
+MAX_BATCH_SECONDS = 600
 
 class BulkJobStarter:
     def __init__(self, base_url: str = "http://209.74.95.163:5000"):
         self.base_url = base_url
         self.session = requests.Session()
+        # Enough pooled connections for every worker to keep its own alive. Start and
+        # stop are idempotent on the server, so POSTs are retried too; the final
+        # response is still handed back (raise_on_status=False) to report the error
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=BULK_WORKERS,
+            max_retries=Retry(
+                total=RETRY_ATTEMPTS,
+                backoff_factor=RETRY_BACKOFF,
+                backoff_max=RETRY_BACKOFF_MAX,
+                backoff_jitter=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({'GET', 'POST'}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.token = None
         self.user_id = None
         
+    def login_cached(self) -> bool:
+        """Reuse a login saved by an earlier run, if the server still accepts its token"""
+        cached = load_cached_tokens().get(self.base_url)
+        if not cached:
+            return False
+        
+        self.session.headers['Authorization'] = f"Bearer {cached['token']}"
+        try:
+            response = self.session.get(f"{self.base_url}/api/auth/profile", timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                self.token = cached['token']
+                self.user_id = cached['user_id']
+                print(f"✅ Using saved login for {json_loads(response.content)['user']['email']}")
+                return True
+        except Exception as e:
+            print(f"⚠️  Could not check saved login: {e}")
+        
+        del self.session.headers['Authorization']
+        return False
+    
     def login(self, email: str, password: str) -> bool:
         """Login to the API and get authentication token"""
         try:
@@ -20,101 +83,173 @@ class BulkJobStarter:
             }
             
             print(f"🔐 Logging in with email: {email}")
-            response = self.session.post(login_url, json=login_data)
+            response = self.session.post(login_url, json=login_data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 self.token = data['token']
                 self.user_id = data['user']['user_id']
+                # Every later request carries the token without building a headers dict
+                self.session.headers['Authorization'] = f"Bearer {self.token}"
+                save_cached_token(self.base_url, self.token, self.user_id)
                 print(f"✅ Login successful!")
                 print(f"   User ID: {self.user_id}")
                 return True
             else:
-                print(f"❌ Login failed: {response.json().get('error', 'Unknown error')}")
+                print(f"❌ Login failed: {error_message(response)}")
                 return False
                 
         except Exception as e:
             print(f"❌ Login error: {e}")
             return False
     
-    def get_all_jobs(self) -> List[Dict]:
-        """Get all jobs for the authenticated user"""
+    def get_all_jobs(self, status: Optional[str] = None) -> List[Dict]:
+        """Get all jobs for the authenticated user, optionally only those in the given (comma-separated) statuses"""
         try:
             jobs_url = f"{self.base_url}/api/jobs"
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            
-            print(f"📋 Fetching all jobs...")
-            response = self.session.get(jobs_url, headers=headers)
+            print(f"📋 Fetching {status or 'all'} jobs...")
+            params = {"status": status} if status else None
+            response = self.session.get(jobs_url, params=params, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 jobs = data['jobs']
                 print(f"✅ Found {len(jobs)} jobs")
                 return jobs
             else:
-                print(f"❌ Failed to fetch jobs: {response.json().get('error', 'Unknown error')}")
+                print(f"❌ Failed to fetch jobs: {error_message(response)}")
                 return []
                 
         except Exception as e:
             print(f"❌ Error fetching jobs: {e}")
             return []
     
+    def get_total_jobs(self, fallback: int) -> int:
+        """Total number of the user's jobs from /api/status, or `fallback` if it can't be fetched"""
+        try:
+            response = self.session.get(f"{self.base_url}/api/status", timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                return json_loads(response.content)['status']['total_jobs']
+        except Exception:
+            pass
+        return fallback
+    
     def start_job(self, job_id: str, job_name: str) -> bool:
         """Start a specific job"""
         try:
             start_url = f"{self.base_url}/api/jobs/{job_id}/start"
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            
             # Include API key if available (optional)
             data = {}
             
-            response = self.session.post(start_url, json=data, headers=headers)
+            response = self.session.post(start_url, json=data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 return True
             else:
-                error_msg = response.json().get('error', 'Unknown error')
-                print(f"   ❌ Failed: {error_msg}")
+                error_msg = error_message(response)
+                print(f"   ❌ Failed to start {job_name}: {error_msg}")
                 return False
                 
         except Exception as e:
-            print(f"   ❌ Error: {e}")
+            print(f"   ❌ Error starting {job_name}: {e}")
             return False
     
-    def start_all_jobs(self, delay_between_starts: float = 0.5):
+    def _run_batch(self, endpoint: str, jobs: List[Dict], done_key: str, verb: str):
+        """POST all job ids to a batch endpoint; returns (succeeded, failed, skipped), or None to fall back to per-job calls"""
+        by_id = {job['job_id']: job for job in jobs}
+        try:
+            response = self.session.post(f"{self.base_url}/api/jobs/{endpoint}",
+                                         data=json_dumps({"job_ids": list(by_id)}), headers=JSON_HEADERS,
+                                         timeout=BATCH_TIMEOUT)
+        except Exception as e:
+            # Start and stop are idempotent, so repeating them job by job is safe
+            print(f"   ⚠️  Batch request failed ({e}), falling back to one request per job")
+            return None
+        
+        # An older server has no batch endpoints
+        if response.status_code in (404, 405):
+            return None
+        if response.status_code != 200:
+            print(f"   ⚠️  Batch request failed ({error_message(response)}), falling back to one request per job")
+            return None
+        try:
+            data = json_loads(response.content)
+        except ValueError:
+            print("   ⚠️  Batch response was not JSON, falling back to one request per job")
+            return None
+        
+        succeeded = [by_id[job_id] for job_id in data[done_key] if job_id in by_id]
+        progress = []
+        for done, job in enumerate(succeeded, 1):
+            job_name = job['name']
+            label = f"{job_name[:50]}{'...' if len(job_name) > 50 else ''}"
+            progress.append(f"   ✅ [{done}/{len(jobs)}] {verb}: {label}")
+        failed = []
+        for item in data['failed']:
+            job = by_id.get(item['job_id'])
+            if job:
+                failed.append(job)
+                progress.append(f"   ❌ Failed: {job['name']}: {item['error']}")
+        write_lines(progress)
+        return succeeded, failed, []
+    
+    def _run_concurrently(self, action, jobs: List[Dict], verb: str):
+        """Apply action(job_id, job_name) to every job over the worker pool; returns (succeeded, failed, skipped)"""
+        succeeded = []
+        failed = []
+        skipped = []
+        progress = []
+        deadline = time.monotonic() + MAX_BATCH_SECONDS
+        
+        def run(job):
+            # None marks a job never sent because the batch ran out of time
+            if time.monotonic() > deadline:
+                return None
+            return action(job['job_id'], job['name'])
+        
+        with ThreadPoolExecutor(max_workers=BULK_WORKERS) as executor:
+            futures = {executor.submit(run, job): job for job in jobs}
+            # Collected on this thread as requests finish, so the lists need no locking
+            for done, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                job_name = job['name']
+                label = f"{job_name[:50]}{'...' if len(job_name) > 50 else ''}"
+                result = future.result()
+                if result:
+                    succeeded.append(job)
+                    progress.append(f"   ✅ [{done}/{len(jobs)}] {verb}: {label}")
+                    if len(progress) >= PROGRESS_BATCH:
+                        write_lines(progress)
+                elif result is None:
+                    skipped.append(job)
+                else:
+                    failed.append(job)
+        write_lines(progress)
+        if skipped:
+            print(f"   ⏱️  Time budget of {MAX_BATCH_SECONDS}s used up; {len(skipped)} jobs skipped, run again to retry them")
+        return succeeded, failed, skipped
+    
+    def start_all_jobs(self):
         """Start all jobs for the authenticated user"""
         print(f"🚀 Starting bulk job activation process")
         print("=" * 60)
         
-        # Get all jobs
-        jobs = self.get_all_jobs()
+        # The server filters out running jobs; the check here covers servers that ignore the filter
+        jobs = self.get_all_jobs(status=NOT_RUNNING_STATUSES)
+        jobs_to_start = [job for job in jobs if job['status'] != 'running']
+        total_jobs = self.get_total_jobs(fallback=len(jobs))
         
-        if not jobs:
+        if not total_jobs:
             print("❌ No jobs found to start")
             return
         
-        # Filter jobs that are not already running
-        jobs_to_start = [job for job in jobs if job['status'] != 'running']
-        already_running = [job for job in jobs if job['status'] == 'running']
+        already_running = total_jobs - len(jobs_to_start)
         
         print(f"\n📊 Job Status Summary:")
-        print(f"   Total jobs: {len(jobs)}")
-        print(f"   Already running: {len(already_running)}")
+        print(f"   Total jobs: {total_jobs}")
+        print(f"   Already running: {already_running}")
         print(f"   To be started: {len(jobs_to_start)}")
         
-        if already_running:
-            print(f"\n⚡ Already running jobs:")
-            for job in already_running[:5]:  # Show first 5
-                print(f"   • {job['name']} (ID: {job['job_id']})")
-            if len(already_running) > 5:
-                print(f"   ... and {len(already_running) - 5} more")
-        
         if not jobs_to_start:
             print(f"\n✅ All jobs are already running!")
             return
@@ -126,30 +261,14 @@ class BulkJobStarter:
             print("❌ Operation cancelled")
             return
         
-        # Start each job
-        started_jobs = []
-        failed_jobs = []
-        
+        # One batch request; per-job requests over the worker pool if the server lacks it
         print(f"\n🔄 Starting jobs...")
         print("-" * 60)
         
-        for i, job in enumerate(jobs_to_start, 1):
-            job_id = job['job_id']
-            job_name = job['name']
-            
-            print(f"🔄 Starting job {i}/{len(jobs_to_start)}: {job_name[:50]}{'...' if len(job_name) > 50 else ''}")
-            
-            success = self.start_job(job_id, job_name)
-            
-            if success:
-                started_jobs.append(job)
-                print(f"   ✅ Started successfully")
-            else:
-                failed_jobs.append(job)
-            
-            # Small delay between requests to avoid overwhelming the server
-            if i < len(jobs_to_start):
-                time.sleep(delay_between_starts)
+        result = self._run_batch('batch_start', jobs_to_start, 'started', "Started")
+        if result is None:
+            result = self._run_concurrently(self.start_job, jobs_to_start, "Started")
+        started_jobs, failed_jobs, skipped_jobs = result
         
         # Summary
         print("\n" + "=" * 60)
@@ -157,7 +276,9 @@ class BulkJobStarter:
         print("=" * 60)
         print(f"✅ Successfully started: {len(started_jobs)} jobs")
         print(f"❌ Failed to start: {len(failed_jobs)} jobs")
-        print(f"⚡ Already running: {len(already_running)} jobs")
+        if skipped_jobs:
+            print(f"⏱️  Skipped (out of time): {len(skipped_jobs)} jobs")
+        print(f"⚡ Already running: {already_running} jobs")
         
         if failed_jobs:
             print(f"\n❌ FAILED TO START:")
@@ -166,8 +287,8 @@ class BulkJobStarter:
             if len(failed_jobs) > 10:
                 print(f"   ... and {len(failed_jobs) - 10} more")
         
-        total_running = len(started_jobs) + len(already_running)
-        print(f"\n🎯 Total jobs now running: {total_running}/{len(jobs)}")
+        total_running = len(started_jobs) + already_running
+        print(f"\n🎯 Total jobs now running: {total_running}/{total_jobs}")
         print(f"🎉 Success rate: {len(started_jobs)/(len(jobs_to_start) if jobs_to_start else 1)*100:.1f}%")
         
         if started_jobs:
@@ -178,35 +299,33 @@ class BulkJobStarter:
         """Stop a specific job"""
         try:
             stop_url = f"{self.base_url}/api/jobs/{job_id}/stop"
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            response = self.session.post(stop_url, headers=headers)
+            response = self.session.post(stop_url, timeout=REQUEST_TIMEOUT)
             if response.status_code == 200:
                 return True
             else:
-                error_msg = response.json().get('error', 'Unknown error')
-                print(f"   ❌ Failed to stop: {error_msg}")
+                error_msg = error_message(response)
+                print(f"   ❌ Failed to stop {job_name}: {error_msg}")
                 return False
         except Exception as e:
-            print(f"   ❌ Error stopping job: {e}")
+            print(f"   ❌ Error stopping {job_name}: {e}")
             return False
 
-    def stop_all_jobs(self, delay_between_stops: float = 0.5):
+    def stop_all_jobs(self):
         """Stop all running jobs for the authenticated user"""
         print(f"🛑 Stopping all running jobs...")
         print("=" * 60)
-        jobs = self.get_all_jobs()
-        if not jobs:
+        # The server returns only running jobs; the check here covers servers that ignore the filter
+        jobs = self.get_all_jobs(status='running')
+        jobs_to_stop = [job for job in jobs if job['status'] == 'running']
+        total_jobs = self.get_total_jobs(fallback=len(jobs))
+        if not total_jobs:
             print("❌ No jobs found to stop")
             return
-        jobs_to_stop = [job for job in jobs if job['status'] == 'running']
-        not_running = [job for job in jobs if job['status'] != 'running']
+        not_running = total_jobs - len(jobs_to_stop)
         print(f"\n📊 Job Status Summary:")
-        print(f"   Total jobs: {len(jobs)}")
+        print(f"   Total jobs: {total_jobs}")
         print(f"   Running: {len(jobs_to_stop)}")
-        print(f"   Not running: {len(not_running)}")
+        print(f"   Not running: {not_running}")
         if not jobs_to_stop:
             print(f"\n✅ No jobs are running!")
             return
@@ -215,36 +334,28 @@ class BulkJobStarter:
         if confirm != 'y':
             print("❌ Operation cancelled")
             return
-        stopped_jobs = []
-        failed_jobs = []
         print(f"\n🔄 Stopping jobs...")
         print("-" * 60)
-        for i, job in enumerate(jobs_to_stop, 1):
-            job_id = job['job_id']
-            job_name = job['name']
-            print(f"🔄 Stopping job {i}/{len(jobs_to_stop)}: {job_name[:50]}{'...' if len(job_name) > 50 else ''}")
-            success = self.stop_job(job_id, job_name)
-            if success:
-                stopped_jobs.append(job)
-                print(f"   ✅ Stopped successfully")
-            else:
-                failed_jobs.append(job)
-            if i < len(jobs_to_stop):
-                time.sleep(delay_between_stops)
+        result = self._run_batch('batch_stop', jobs_to_stop, 'stopped', "Stopped")
+        if result is None:
+            result = self._run_concurrently(self.stop_job, jobs_to_stop, "Stopped")
+        stopped_jobs, failed_jobs, skipped_jobs = result
         print("\n" + "=" * 60)
         print("📊 BULK JOB STOP SUMMARY")
         print("=" * 60)
         print(f"✅ Successfully stopped: {len(stopped_jobs)} jobs")
         print(f"❌ Failed to stop: {len(failed_jobs)} jobs")
-        print(f"⚡ Not running: {len(not_running)} jobs")
+        if skipped_jobs:
+            print(f"⏱️  Skipped (out of time): {len(skipped_jobs)} jobs")
+        print(f"⚡ Not running: {not_running} jobs")
         if failed_jobs:
             print(f"\n❌ FAILED TO STOP:")
             for job in failed_jobs[:10]:
                 print(f"   • {job['name']} (ID: {job['job_id']})")
             if len(failed_jobs) > 10:
                 print(f"   ... and {len(failed_jobs) - 10} more")
-        total_not_running = len(stopped_jobs) + len(not_running)
-        print(f"\n🎯 Total jobs now not running: {total_not_running}/{len(jobs)}")
+        total_not_running = len(stopped_jobs) + not_running
+        print(f"\n🎯 Total jobs now not running: {total_not_running}/{total_jobs}")
         print(f"🎉 Success rate: {len(stopped_jobs)/(len(jobs_to_stop) if jobs_to_stop else 1)*100:.1f}%")
         if stopped_jobs:
             print(f"\n🛑 All stopped jobs will no longer monitor their URLs until started again!")
@@ -255,15 +366,11 @@ def main():
     print("🚀 Web Change Monitor - Bulk Job Starter")
     print("=" * 50)
     
-    # Configuration
-    EMAIL = "faizalmohamed.vi@gmail.com"
-    PASSWORD = "Faizal@123"
-    
     # Create job starter instance
     starter = BulkJobStarter()
     
-    # Login
-    if not starter.login(EMAIL, PASSWORD):
+    # Login, reusing the saved token from an earlier run when it's still valid
+    if not starter.login_cached() and not starter.login(*get_credentials()):
         print("❌ Cannot proceed without login. Exiting...")
         return
     
@@ -1,14 +1,76 @@
 #!/usr/bin/env python3
 """
 Test script demonstrating different authentication methods for the Web Monitor API
+
+Run it directly for a narrated walkthrough, or with pytest against a running server
+(PINGVISUAL_URL, default http://localhost:5000; the tests skip if it isn't reachable).
 """
 
+import os
+import uuid
 import requests
-import json
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import pytest
+
+from client_common import json_loads, json_dumps
 
-BASE_URL = "http://localhost:5000"
+BASE_URL = os.getenv('PINGVISUAL_URL', "http://localhost:5000")
+
+# How a successful API reply starts: "success" is the first key of every response.
+# Both the compact (orjson) and the stdlib separators are accepted; any other
+# spelling falls back to parsing the body
+SUCCESS_PREFIXES = (b'{"success":true', b'{"success": true')
+SNIFF_BYTES = 64
+
+def make_session() -> requests.Session:
+    """Session whose pooled connection is kept for every call; retries refused connects and 502-504 (GETs only)"""
+    session = requests.Session()
+    # requests sends this by default; pinned so every step of the run stays on one
+    # socket even if something in between strips the default
+    session.headers["Connection"] = "keep-alive"
+    # Bodies are pre-encoded with json_dumps and sent as data=
+    session.headers["Content-Type"] = "application/json"
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20,
+                          max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504]))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def test_authentication_methods():
+def make_probe_pool() -> urllib3.PoolManager:
+    """Bare urllib3 pool for the plain auth-probe GETs: no request preparation and no cookies"""
+    return urllib3.PoolManager(num_pools=1, maxsize=20,
+                               retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504]))
+
+def reports_success(raw) -> bool:
+    """True if a streamed JSON reply reports success; the rest of the body is read and parsed only when its start doesn't settle it"""
+    head = raw.read(SNIFF_BYTES)
+    if head.lstrip().startswith(SUCCESS_PREFIXES):
+        return True
+    try:
+        return json_loads(head + raw.read())['success'] is True
+    except (ValueError, KeyError, TypeError):
+        return False
+
+def call_succeeded(response: requests.Response) -> bool:
+    """True for a 200 whose JSON body reports success (response fetched with stream=True)"""
+    return response.status_code == 200 and reports_success(response.raw)
+
+def probe(http: urllib3.PoolManager, url: str, **kwargs) -> tuple:
+    """GET url and return (status, passed), reading only the start of the body when that is enough"""
+    response = http.request("GET", url, preload_content=False, **kwargs)
+    try:
+        return response.status, response.status == 200 and reports_success(response)
+    finally:
+        # Discard the rest without keeping it, so the connection can be reused
+        response.drain_conn()
+        response.release_conn()
+
+def run_authentication_methods(s: requests.Session = None):
     print("🔐 Testing Web Monitor API Authentication Methods")
     print("=" * 50)
     
@@ -16,16 +78,40 @@ def test_authentication_methods():
     email = "test@example.com"
     password = "testpass123"
     
+    # One keep-alive connection for register and the job calls (the caller's, if it
+    # passed one in). It refuses cookies, so the session set up by register can't make
+    # the token checks below pass on its own
+    own_session = s is None
+    if own_session:
+        s = make_session()
+    s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    http = make_probe_pool()
+    try:
+        _run_auth_checks(s, http, email, password)
+    finally:
+        if own_session:
+            s.close()
+        http.clear()
+
+def _run_auth_checks(s, http, email, password):
+    # Open a connection in both pools first, so DNS lookup and TCP setup aren't
+    # counted against the first real step
+    s.get(f"{BASE_URL}/api/health", timeout=5)
+    http.request("GET", f"{BASE_URL}/api/health", timeout=5)
+    print("🔥 Connection pools warmed")
+    
     # 1. Register a test user
     print("\n1. Registering test user...")
     register_data = {
         "email": email,
         "password": password
     }
+    # Encoded once: step 2 logs in with the same body
+    register_body = json_dumps(register_data)
     
-    response = requests.post(f"{BASE_URL}/api/auth/register", json=register_data)
+    response = s.post(f"{BASE_URL}/api/auth/register", data=register_body)
     if response.status_code == 201:
-        data = response.json()
+        data = json_loads(response.content)
         user_id = data['token']  # The user_id is returned as token
         print(f"✅ User registered successfully!")
         print(f"   User ID (Token): {user_id}")
@@ -33,80 +119,58 @@ def test_authentication_methods():
         print(f"❌ Registration failed: {response.text}")
         return
     
-    # 2. Test session-based authentication (cookies)
-    print("\n2. Testing Session Authentication (Cookies)...")
-    session = requests.Session()
-    login_response = session.post(f"{BASE_URL}/api/auth/login", json=register_data)
-    
-    if login_response.status_code == 200:
-        print("✅ Login successful with session")
-        # Test API call with session
-        jobs_response = session.get(f"{BASE_URL}/api/jobs")
-        print(f"   Jobs API call: {jobs_response.status_code} - {jobs_response.json()['success']}")
-    else:
-        print(f"❌ Login failed: {login_response.text}")
-    
-    # 3. Test Bearer token authentication
-    print("\n3. Testing Bearer Token Authentication...")
-    headers = {
-        "Authorization": f"Bearer {user_id}",
-        "Content-Type": "application/json"
-    }
+    # Steps 2-5 are collected as (method, HTTP status, passed) and reported together
+    results = []
     
-    jobs_response = requests.get(f"{BASE_URL}/api/jobs", headers=headers)
-    if jobs_response.status_code == 200:
-        print("✅ Bearer token authentication successful")
-        print(f"   Jobs API call: {jobs_response.status_code} - {jobs_response.json()['success']}")
-    else:
-        print(f"❌ Bearer token auth failed: {jobs_response.text}")
-    
-    # 4. Test X-User-Token header authentication
-    print("\n4. Testing X-User-Token Header Authentication...")
-    headers = {
-        "X-User-Token": user_id,
-        "Content-Type": "application/json"
-    }
+    # 2. Test session-based authentication (cookies)
+    with make_session() as session:
+        login_response = session.post(f"{BASE_URL}/api/auth/login", data=register_body)
+        if login_response.status_code == 200:
+            with session.get(f"{BASE_URL}/api/jobs", stream=True) as jobs_response:
+                results.append(("Session cookies", jobs_response.status_code, call_succeeded(jobs_response)))
+        else:
+            results.append(("Session cookies (login)", login_response.status_code, False))
     
-    jobs_response = requests.get(f"{BASE_URL}/api/jobs", headers=headers)
-    if jobs_response.status_code == 200:
-        print("✅ X-User-Token authentication successful")
-        print(f"   Jobs API call: {jobs_response.status_code} - {jobs_response.json()['success']}")
-    else:
-        print(f"❌ X-User-Token auth failed: {jobs_response.text}")
+    # Built once and reused. Not set on the session: steps 4 and 5 must authenticate
+    # without a Bearer header
+    bearer_headers = {"Authorization": f"Bearer {user_id}"}
     
-    # 5. Test query parameter authentication
-    print("\n5. Testing Query Parameter Authentication...")
+    # 3-5. Bearer token, X-User-Token header and query parameter. They are independent,
+    # so their requests run at once over the probe pool
+    auth_specs = [
+        ("Bearer token", {"headers": bearer_headers}),
+        ("X-User-Token header", {"headers": {"X-User-Token": user_id}}),
+        ("Query parameter", {"fields": {"token": user_id}}),
+    ]
+    jobs_url = f"{BASE_URL}/api/jobs"
+    with ThreadPoolExecutor(max_workers=len(auth_specs)) as executor:
+        probes = [(label, executor.submit(probe, http, jobs_url, **kwargs)) for label, kwargs in auth_specs]
+    for label, future in probes:
+        results.append((label, *future.result()))
     
-    jobs_response = requests.get(f"{BASE_URL}/api/jobs?token={user_id}")
-    if jobs_response.status_code == 200:
-        print("✅ Query parameter authentication successful")
-        print(f"   Jobs API call: {jobs_response.status_code} - {jobs_response.json()['success']}")
-    else:
-        print(f"❌ Query parameter auth failed: {jobs_response.text}")
+    print("\n2-5. Testing Authentication Methods (Jobs API call)...\n" + "\n".join(
+        f"{'✅' if passed else '❌'} {label}: {status}" for label, status, passed in results
+    ))
     
     # 6. Test creating a job with token authentication
     print("\n6. Testing Job Creation with Bearer Token...")
-    headers = {
-        "Authorization": f"Bearer {user_id}",
-        "Content-Type": "application/json"
-    }
-    
     job_data = {
         "name": "Test Website Monitor",
         "url": "https://httpbin.org/html",
         "check_interval_minutes": 5
     }
+    job_body = json_dumps(job_data)
     
-    create_response = requests.post(f"{BASE_URL}/api/jobs", json=job_data, headers=headers)
+    create_response = s.post(f"{BASE_URL}/api/jobs", data=job_body, headers=bearer_headers)
     if create_response.status_code == 201:
-        job_info = create_response.json()
+        job_info = json_loads(create_response.content)
         job_id = job_info['job_id']
         print("✅ Job created successfully with token auth")
         print(f"   Job ID: {job_id}")
         print(f"   Job Name: {job_info['job']['name']}")
         
         # Test getting job details
-        job_response = requests.get(f"{BASE_URL}/api/jobs/{job_id}", headers=headers)
+        job_response = s.get(f"{BASE_URL}/api/jobs/{job_id}", headers=bearer_headers)
         if job_response.status_code == 200:
             print("✅ Job details retrieved successfully")
         
@@ -123,14 +187,73 @@ def test_authentication_methods():
     print(f"\n🔑 Your User Token: {user_id}")
     print("   Use this token for API access without sessions")
 
+# Created once per module run and shared by every test below
+@pytest.fixture(scope="module")
+def api_session():
+    """Keep-alive session that refuses cookies, so token tests can't pass on a login cookie"""
+    with make_session() as session:
+        try:
+            session.get(f"{BASE_URL}/api/health", timeout=5)
+        except requests.exceptions.ConnectionError:
+            pytest.skip(f"API not reachable at {BASE_URL}")
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        yield session
+
+@pytest.fixture(scope="module")
+def probe_pool():
+    http = make_probe_pool()
+    yield http
+    http.clear()
+
+@pytest.fixture(scope="module")
+def credentials():
+    # A fresh user per run, so reruns don't collide with an existing account
+    return {"email": f"test-{uuid.uuid4().hex[:12]}@example.com", "password": "testpass123"}
+
+@pytest.fixture(scope="module")
+def auth_user(api_session, credentials):
+    """Register once per module run and return the user id (the API token)"""
+    response = api_session.post(f"{BASE_URL}/api/auth/register", data=json_dumps(credentials))
+    assert response.status_code == 201, response.text
+    return json_loads(response.content)['token']
+
+def test_register(auth_user):
+    assert auth_user
+
+def test_session_login(auth_user, credentials):
+    with make_session() as session:
+        login_response = session.post(f"{BASE_URL}/api/auth/login", data=json_dumps(credentials))
+        assert login_response.status_code == 200, login_response.text
+        with session.get(f"{BASE_URL}/api/jobs", stream=True) as jobs_response:
+            assert call_succeeded(jobs_response)
+
+def test_bearer_token(auth_user, probe_pool):
+    assert probe(probe_pool, f"{BASE_URL}/api/jobs", headers={"Authorization": f"Bearer {auth_user}"}) == (200, True)
+
+def test_x_user_token(auth_user, probe_pool):
+    assert probe(probe_pool, f"{BASE_URL}/api/jobs", headers={"X-User-Token": auth_user}) == (200, True)
+
+def test_query_parameter(auth_user, probe_pool):
+    assert probe(probe_pool, f"{BASE_URL}/api/jobs", fields={"token": auth_user}) == (200, True)
+
+def test_create_job(api_session, auth_user):
+    bearer_headers = {"Authorization": f"Bearer {auth_user}"}
+    job_data = {"name": "Test Website Monitor", "url": "https://httpbin.org/html", "check_interval_minutes": 5}
+    create_response = api_session.post(f"{BASE_URL}/api/jobs", data=json_dumps(job_data), headers=bearer_headers)
+    assert create_response.status_code == 201, create_response.text
+    job_id = json_loads(create_response.content)['job_id']
+    job_response = api_session.get(f"{BASE_URL}/api/jobs/{job_id}", headers=bearer_headers)
+    assert job_response.status_code == 200
+
 if __name__ == "__main__":
     try:
-        # Check if API is running
-        health_response = requests.get(f"{BASE_URL}/api/health", timeout=5)
-        if health_response.status_code == 200:
-            test_authentication_methods()
-        else:
-            print("❌ API is not responding correctly")
+        # Check if API is running; the tests then reuse the health check's connection
+        with make_session() as s:
+            health_response = s.get(f"{BASE_URL}/api/health", timeout=5)
+            if health_response.status_code == 200:
+                run_authentication_methods(s)
+            else:
+                print("❌ API is not responding correctly")
     except requests.exceptions.ConnectionError:
         print("❌ Cannot connect to API. Make sure the server is running on http://localhost:5000")
     except Exception as e:
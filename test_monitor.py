@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the job monitoring loop in api.monitor.py (run with pytest; no server or browser needed)
+"""
+
+import importlib.util
+import os
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """api.monitor loaded inside a scratch directory, so its jobs/users/results files stay out of the repo"""
+    workdir = tmp_path_factory.mktemp("api")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location("api_monitor", os.path.join(HERE, "api.monitor.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        # Background and exit-time saves run after the directory is restored, so pin the paths
+        module.job_manager.jobs_file = str(workdir / "jobs.json")
+        module.job_manager.results_dir = str(workdir / "results")
+        module.user_manager.users_file = str(workdir / "users.json")
+        yield module
+    finally:
+        os.chdir(cwd)
+
+def test_failing_site_keeps_retrying(api, monkeypatch):
+    """A page that never scrapes keeps its job running (and backing off) until it is stopped"""
+    monkeypatch.setattr(api, "error_backoff", lambda consecutive_errors: 0)
+    attempts = []
+    def scrape_page(self):
+        # scrape_page reports every failure by returning None
+        attempts.append(1)
+        return None
+    monkeypatch.setattr(api.WebChangeMonitor, "scrape_page", scrape_page)
+    
+    manager = api.job_manager
+    job_id = manager.create_job("user-1", "Down site", "http://127.0.0.1:9/", 0)
+    assert manager.start_job(job_id)
+    deadline = time.monotonic() + 10
+    while len(attempts) < 30 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    job = manager.jobs[job_id]
+    assert len(attempts) >= 30
+    assert job.status == 'running'
+    assert "No content scraped" in job.error_message
+    assert job.total_checks == 0
+    
+    assert manager.stop_job(job_id)
+    assert job.status == 'stopped'
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the page diffing in webmonitor.py (run with pytest; no network or browser needed)
+"""
+
+import pytest
+
+from webmonitor import WebChangeMonitor
+
+FIRST = "We backed Acme Robotics in their seed round this spring"
+SECOND = "Our second fund closed above its target of fifty million"
+THIRD = "Beta Health joined us after a long search for partners"
+LAST = "Thanks to everyone who made this such a remarkable year"
+
+@pytest.fixture
+def monitor():
+    """Text-only monitor: no driver, no AI analyzer, advanced mode off"""
+    monitor = object.__new__(WebChangeMonitor)
+    monitor.ai_analyzer = None
+    monitor.advanced_mode = False
+    monitor.previous_html = None
+    monitor.current_html = None
+    return monitor
+
+def snapshot(*paragraphs):
+    return {'text': "\n".join(paragraphs), 'hash': str(hash(paragraphs)), 'timestamp': "2025-01-01T00:00:00"}
+
+@pytest.mark.parametrize("precise", [False, True])
+def test_diff_is_in_document_order(monitor, precise):
+    old = ["a", "b", "c", "d", "e"]
+    new = ["x", "a", "c", "y", "z", "e", "w"]
+    assert monitor.diff_paragraphs(old, new, precise) == [
+        ('added', 0), ('removed', 1), ('removed', 3), ('added', 3), ('added', 4), ('added', 6),
+    ]
+
+@pytest.mark.parametrize("precise", [False, True])
+def test_moved_paragraph_is_reported(monitor, precise):
+    old = ["a", "b", "c", "d"]
+    new = ["b", "c", "d", "a"]
+    assert monitor.diff_paragraphs(old, new, precise) == [('removed', 0), ('added', 3)]
+
+def test_compare_content_keeps_order_and_moves(monitor):
+    # THIRD is new at the top, SECOND moved to the end
+    changes = monitor.compare_content(snapshot(FIRST, SECOND, LAST), snapshot(THIRD, FIRST, LAST, SECOND))
+    assert len(changes) == 1
+    assert [(c['type'], c['content'], c['position']) for c in changes[0]['details']] == [
+        ('added', THIRD, 0), ('removed', SECOND, 1), ('added', SECOND, 3),
+    ]
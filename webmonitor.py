@@ -1,25 +1,67 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import WebDriverException
+from bs4 import BeautifulSoup, NavigableString, CData
 import time
-import json
+import orjson
+import hashlib
 import threading
 from datetime import datetime
 from flask import Flask, render_template, jsonify
 import difflib
+import bisect
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 
 from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env file
 
+# Pages that flip back and forth produce the same change again and again, so a
+# successful AI analysis is reused for a while instead of asking the model again
+AI_CACHE_TTL = 3600  # seconds
+AI_CACHE_SIZE = 512
+
 class AIAnalyzer:
+    # A reply wrapped in a markdown code fence; the whole opening line (```json, ```JSON, ```jsonc...) is dropped
+    _FENCE_RE = re.compile(r'^```[^\n]*\n(.*?)\n?```', re.DOTALL)
+    
     def __init__(self, api_key):
         self.api_key = api_key
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        # One keep-alive session, so each analysis reuses the TLS connection to OpenRouter
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                              max_retries=Retry(total=2, backoff_factor=0.3))
+        self.session.mount('https://', adapter)
+        self._cache = {}  # blake2b(prompt context) -> (expires_at, analysis)
+        
+    def _cached_analysis(self, key):
+        """Return a fresh copy of a cached analysis, or None"""
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+        self._cache.pop(key, None)
+        return None
+        
+    def _remember_analysis(self, key, analysis):
+        """Cache a successful analysis, evicting the oldest entry when full"""
+        if len(self._cache) >= AI_CACHE_SIZE:
+            # Dicts keep insertion order, so the first key is the oldest
+            self._cache.pop(next(iter(self._cache)), None)
+        self._cache[key] = (time.monotonic() + AI_CACHE_TTL, dict(analysis))
         
     def analyze_portfolio_changes(self, change_data):
         """Analyze changes using AI to detect new portfolio companies"""
@@ -30,6 +72,12 @@ class AIAnalyzer:
             if not context:
                 return None
                 
+            # The context is exactly what the model sees; timestamps are left out of it
+            cache_key = hashlib.blake2b(context.encode(), digest_size=16).digest()
+            cached = self._cached_analysis(cache_key)
+            if cached:
+                return cached
+                
             prompt = f"""
     You are an expert analyst specializing in investor portfolios and venture capital firms. 
     Analyze the following website changes to determine if any new companies have been added to an investor's portfolio.
@@ -73,11 +121,6 @@ class AIAnalyzer:
     Focus only on actual portfolio company additions, not general website updates or news.
     """
 
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             data = {
                 "model": "deepseek/deepseek-r1:free",
                 "messages": [
@@ -90,29 +133,19 @@ class AIAnalyzer:
                 "max_tokens": 1000
             }
             
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
+            response = self.session.post(self.base_url, data=orjson.dumps(data), timeout=30)
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 ai_response = result['choices'][0]['message']['content'].strip()
                 
                 # Extract JSON from markdown code blocks if present
-                if ai_response.startswith('```json'):
-                    # Find the JSON content between ```json and ```
-                    start_marker = '```json'
-                    end_marker = '```'
-                    start_idx = ai_response.find(start_marker) + len(start_marker)
-                    end_idx = ai_response.find(end_marker, start_idx)
-                    if end_idx != -1:
-                        ai_response = ai_response[start_idx:end_idx].strip()
-                elif ai_response.startswith('```'):
-                    # Handle generic code blocks
-                    lines = ai_response.split('\n')
-                    ai_response = '\n'.join(lines[1:-1])  # Remove first and last line
+                m = self._FENCE_RE.match(ai_response)
+                ai_response = m.group(1) if m else ai_response
                 
                 # Try to parse JSON response
                 try:
-                    parsed_json = json.loads(ai_response)
+                    parsed_json = orjson.loads(ai_response)
                     
                     # Ensure all required fields are present with proper null handling
                     required_fields = {
@@ -128,9 +161,10 @@ class AIAnalyzer:
                         if field not in parsed_json:
                             parsed_json[field] = default_value
                     
+                    self._remember_analysis(cache_key, parsed_json)
                     return parsed_json
                     
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"JSON parsing error: {e}")
                     print(f"Raw AI response: {ai_response}")
                     
@@ -225,11 +259,6 @@ Return your analysis as a JSON structure like this:
 IMPORTANT: Return ONLY valid JSON, no markdown formatting or explanatory text.
 """
 
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             data = {
                 "model": "tngtech/deepseek-r1t2-chimera:free",  # Using the model from your second script
                 "messages": [
@@ -243,30 +272,22 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or explanatory text.
             }
             
             print("🤖 Running advanced HTML comparison analysis...")
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=60)
+            response = self.session.post(self.base_url, data=orjson.dumps(data), timeout=60)
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 ai_response = result['choices'][0]['message']['content'].strip()
                 
                 # Clean up response format
-                if ai_response.startswith('```json'):
-                    start_marker = '```json'
-                    end_marker = '```'
-                    start_idx = ai_response.find(start_marker) + len(start_marker)
-                    end_idx = ai_response.find(end_marker, start_idx)
-                    if end_idx != -1:
-                        ai_response = ai_response[start_idx:end_idx].strip()
-                elif ai_response.startswith('```'):
-                    lines = ai_response.split('\n')
-                    ai_response = '\n'.join(lines[1:-1])
+                m = self._FENCE_RE.match(ai_response)
+                ai_response = m.group(1) if m else ai_response
                 
                 try:
-                    parsed_json = json.loads(ai_response)
+                    parsed_json = orjson.loads(ai_response)
                     print(f"✅ Advanced HTML analysis completed")
                     return parsed_json
                     
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"JSON parsing error in advanced analysis: {e}")
                     return {
                         "analysis_summary": "Advanced analysis completed but JSON parsing failed",
@@ -394,36 +415,308 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or explanatory text.
         
         return "\n".join(context_parts) if context_parts else None
 
+# Navigation/company heuristics run for every changed paragraph on every check,
+# so their keyword lists and regexes are built once here
+NAV_KEYWORDS = (
+    'menu', 'home', 'about', 'about us', 'our team', 'what we do', 
+    'social responsibility', 'news', 'faq', 'venture', 'portfolio',
+    'testimonials', 'overview', 'work with us', 'contact', 'login',
+    'courses', 'resources', 'archives', 'gateway', 'investor login',
+    'innovator resources', 'rapport', 'techatlas', 'planetary'
+)
+
+NAV_PATTERNS = (
+    re.compile(r'\bmenu\b.*\bhome\b.*\babout\b'),  # menu home about pattern
+    re.compile(r'\bhome\s*/\s*\w+\s*/\s*\w+'),     # breadcrumb pattern like "Home / Venture / Portfolio"
+    re.compile(r'(\w+\s+){5,}.*\b(home|about|contact|login)\b')  # long sequence with nav words
+)
+
+UPPERCASE_PATTERN = re.compile(r'\b[A-Z]{2,}\b')
+TITLE_CASE_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+HEADING_PATTERN = re.compile(r'<h[1-6][^>]*>(.*?)</h[1-6]>', re.IGNORECASE)
+COMMON_TITLE_WORDS = frozenset({'The', 'And', 'Or', 'But', 'For', 'With', 'From', 'To', 'Of', 'In', 'On', 'At', 'By'})
+COMPANY_INDICATORS = ('Company', 'Corp', 'Ltd', 'Inc', 'LLC', 'Holdings', 'Group', 'Industries')
+COMPANY_INDICATOR_PATTERNS = {
+    indicator.lower(): re.compile(rf'\b(\w+)\s+{indicator}\b', re.IGNORECASE)
+    for indicator in COMPANY_INDICATORS
+}
+# One scan finds which indicators occur at all, so most paragraphs skip the per-indicator patterns
+COMPANY_INDICATOR_WORD_PATTERN = re.compile(rf"\s({'|'.join(COMPANY_INDICATORS)})\b", re.IGNORECASE)
+
+# Pages that ship an empty app shell and render their content with JavaScript
+JS_APP_MARKERS = (
+    'id="root"></div>', "id='root'></div>", 'id="app"></div>', "id='app'></div>",
+    'id="__next"></div>', 'enable javascript to run this app', 'you need to enable javascript'
+)
+SCRIPT_STYLE_PATTERN = re.compile(r'<(script|style|noscript)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# String node types that get_text() treats as page text (comments, doctypes etc. are skipped)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# lxml's C parser builds the tree several times faster than the pure-Python html.parser
+HTML_PARSER = 'lxml'
+
+# Below this many visible words a static fetch is assumed to have missed JS-rendered content
+MIN_STATIC_WORDS = 50
+
+# Serializes the live DOM a browser load is needed for; falls back to the whole document without a <body>
+RENDERED_BODY_SCRIPT = "return (document.body || document.documentElement).outerHTML;"
+
+# Returned by the fetch methods when the server reports the page unchanged (304)
+NOT_MODIFIED = object()
+
+# (label, attribute) pairs shown, in order, when describing a changed image
+IMAGE_CONTEXT_FIELDS = (
+    ('Alt', 'alt'), ('Title', 'title'), ('Data-ID', 'data-id'),
+    ('Aria-Label', 'aria-label'), ('Caption', 'data-caption')
+)
+
+def index_images(images):
+    """Map each scraped image to its comparison key"""
+    return {img.get('unique_id', img.get('src', '')): img for img in images}
+
+def index_links(links):
+    """Map each scraped link to its comparison key"""
+    return {f"{link['href']}|{link['text']}": link for link in links}
+
+def format_image_context(img, fields=IMAGE_CONTEXT_FIELDS, empty="No additional context"):
+    """Join an image's non-empty context attributes into one " | "-separated string"""
+    return " | ".join(f"{label}: '{img[key]}'" for label, key in fields if img.get(key)) or empty
+
+def looks_js_rendered(html):
+    """Guess whether a page needs a browser to render its content"""
+    html_lower = html.lower()
+    if any(marker in html_lower for marker in JS_APP_MARKERS):
+        return True
+    visible_text = TAG_PATTERN.sub(' ', SCRIPT_STYLE_PATTERN.sub(' ', html))
+    return len(visible_text.split()) < MIN_STATIC_WORDS
+
+def create_http_session():
+    """Create a keep-alive HTTP session for fetching pages without a browser"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    })
+    return session
+
+def create_chrome_driver():
+    """Create a headless Chrome driver"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    
+    service = Service()
+    return webdriver.Chrome(service=service, options=options)
+
+class DriverPool:
+    """A bounded set of Chrome drivers shared by many monitors"""
+    def __init__(self, size=4):
+        self.size = size
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout=None):
+        """Borrow a driver, launching a new one only while the pool is below its size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            launch = self._created < self.size
+            if launch:
+                self._created += 1
+        if launch:
+            try:
+                return create_chrome_driver()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No browser became available within {timeout}s")
+    
+    def release(self, driver):
+        """Return a borrowed driver to the pool"""
+        self._idle.put(driver)
+    
+    def discard(self, driver):
+        """Quit a broken driver and free its slot so a fresh one can be launched"""
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing driver: {e}")
+        with self._lock:
+            self._created -= 1
+    
+    @contextmanager
+    def lease(self, timeout=None):
+        """Borrow a driver for the duration of a with-block"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except WebDriverException:
+            # Crashed or wedged browser; don't hand it to the next job
+            self.discard(driver)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+    
+    def close(self):
+        """Quit every idle driver, in parallel"""
+        drivers = []
+        while True:
+            try:
+                drivers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        if not drivers:
+            return
+        
+        def quit_driver(driver):
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing driver: {e}")
+        
+        # Each quit waits on its browser process; run them side by side
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            list(executor.map(quit_driver, drivers))
+        with self._lock:
+            self._created -= len(drivers)
+
 class WebChangeMonitor:
-    def __init__(self, url="http://127.0.0.1:3003/racap.html", api_key=None, advanced_mode=False):
+    def __init__(self, url="http://127.0.0.1:3003/racap.html", api_key=None, advanced_mode=False, driver_pool=None,
+                 http_session=None, requires_js=None):
         self.url = url
         self.previous_content = None
         self.current_content = None
         self.previous_html = None  # NEW: Store raw HTML for advanced analysis
         self.current_html = None   # NEW: Store raw HTML for advanced analysis
-        self.changes = []
+        self.changes = deque(maxlen=50)  # Only the last 50 changes are kept in memory
         self.running = False
         self.driver = None
+        self.driver_pool = driver_pool  # Shared drivers; when set, no driver of our own is started
+        # Keep-alive session for pages that don't need a browser (shared when one is passed in)
+        self.http_session = http_session or create_http_session()
+        self.requires_js = requires_js  # None: decided from the first static fetch, then kept
         self.advanced_mode = advanced_mode  # NEW: Advanced mode flag
         
+        # Change validators from the last response, and the last scrape they describe, so
+        # unchanged polls can skip the browser and the parse
+        self.etag = None
+        self.last_modified = None
+        self.last_html_digest = None
+        self.last_content = None
+        # Validators of the current static fetch, kept only once its scrape succeeds
+        self.fetched_validators = None
+        
         # Initialize AI analyzer if API key is provided
         self.ai_analyzer = AIAnalyzer(api_key) if api_key else None
         
     def setup_driver(self):
         """Setup Chrome driver with options"""
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        
-        service = Service()
-        self.driver = webdriver.Chrome(service=service, options=options)
+        self.driver = create_chrome_driver()
+    
+    def load_page(self, driver):
+        """Load the monitored URL in a driver and return the page HTML"""
+        driver.get(self.url)
+        time.sleep(5)  # Wait for page to load
+        
+        # NEW: Scroll page for advanced mode
+        if self.advanced_mode:
+            self.scroll_to_bottom(driver)
+        
+        # Only the rendered body is parsed, so skip serializing <head> (inline CSS, preloads, metadata)
+        return driver.execute_script(RENDERED_BODY_SCRIPT)
+    
+    def conditional_headers(self):
+        """If-None-Match / If-Modified-Since for the last response, once there is a scrape to fall back on"""
+        headers = {}
+        if self.last_content is not None:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+        return headers
+    
+    def remember_validators(self):
+        """Keep the ETag / Last-Modified of a successfully scraped static fetch for the next conditional request"""
+        if self.fetched_validators is not None:
+            self.etag, self.last_modified = self.fetched_validators
+        else:
+            # Browser content: the raw HTML's validators say nothing about the rendered page
+            self.etag = self.last_modified = None
+    
+    def check_not_modified(self):
+        """Conditional HEAD before a browser load; True if the server says the page is unchanged"""
+        # The HEAD only sees the raw HTML, so it can't vouch for pages the browser renders
+        if self.requires_js or self.advanced_mode or self.last_content is None:
+            return False
+        try:
+            response = self.http_session.head(self.url, headers=self.conditional_headers(), timeout=5,
+                                              allow_redirects=True)
+        except requests.RequestException:
+            return False
+        return response.status_code == 304
+    
+    def fetch_static_html(self):
+        """Fetch the page over plain HTTP; None if it has to go through a browser instead"""
+        try:
+            response = self.http_session.get(self.url, headers=self.conditional_headers(), timeout=20)
+            if response.status_code == 304:
+                return NOT_MODIFIED
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Static fetch failed for {self.url}, using browser: {e}")
+            return None
+        
+        html_content = response.text
+        if self.requires_js is None:
+            # Decide once so a job's snapshots always come from the same kind of fetch
+            self.requires_js = looks_js_rendered(html_content)
+            print(f"{'Browser' if self.requires_js else 'Static HTTP'} fetching selected for {self.url}")
+        if self.requires_js:
+            return None
+        self.fetched_validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return html_content
+    
+    def fetch_html(self):
+        """Fetch the page HTML, over plain HTTP when the page allows it, else with a browser (NOT_MODIFIED if unchanged)"""
+        self.fetched_validators = None
+        # Pages known to need a browser go straight to it, without any plain-HTTP request;
+        # advanced mode scrolls the page to load lazy content, which needs a browser too
+        if self.http_session and not self.advanced_mode and not self.requires_js:
+            html_content = self.fetch_static_html()
+            if html_content is not None:
+                return html_content
+            
+            # The static fetch failed; a browser load takes seconds, so ask the server first
+            # whether anything changed
+            if self.check_not_modified():
+                return NOT_MODIFIED
+        
+        if self.driver_pool:
+            with self.driver_pool.lease() as driver:
+                return self.load_page(driver)
+        
+        if not self.driver:
+            self.setup_driver()
+        return self.load_page(self.driver)
     
     def clean_html_content(self, html_content):
         """NEW: Clean HTML content similar to the second script"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, HTML_PARSER)
             
             # Remove unwanted elements
             unwanted_tags = [
@@ -431,9 +724,8 @@ class WebChangeMonitor:
                 'sidebar', 'advertisement', 'ads', 'cookie', 'popup'
             ]
             
-            for tag in unwanted_tags:
-                for element in soup.find_all(tag):
-                    element.decompose()
+            for element in soup.find_all(unwanted_tags):
+                element.decompose()
             
             # Remove elements with common unwanted classes/ids
             unwanted_selectors = [
@@ -511,31 +803,16 @@ class WebChangeMonitor:
             
         text_lower = text.lower()
         
-        # Common navigation keywords
-        nav_keywords = [
-            'menu', 'home', 'about', 'about us', 'our team', 'what we do', 
-            'social responsibility', 'news', 'faq', 'venture', 'portfolio',
-            'testimonials', 'overview', 'work with us', 'contact', 'login',
-            'courses', 'resources', 'archives', 'gateway', 'investor login',
-            'innovator resources', 'rapport', 'techatlas', 'planetary'
-        ]
-        
         # Check if text contains multiple navigation keywords
-        keyword_count = sum(1 for keyword in nav_keywords if keyword in text_lower)
+        keyword_count = sum(1 for keyword in NAV_KEYWORDS if keyword in text_lower)
         
         # If text is short and contains nav keywords, likely navigation
         if len(text) < 500 and keyword_count >= 3:
             return True
             
         # Check for typical navigation patterns
-        nav_patterns = [
-            r'\bmenu\b.*\bhome\b.*\babout\b',  # menu home about pattern
-            r'\bhome\s*/\s*\w+\s*/\s*\w+',     # breadcrumb pattern like "Home / Venture / Portfolio"
-            r'(\w+\s+){5,}.*\b(home|about|contact|login)\b'  # long sequence with nav words
-        ]
-        
-        for pattern in nav_patterns:
-            if re.search(pattern, text_lower):
+        for pattern in NAV_PATTERNS:
+            if pattern.search(text_lower):
                 return True
         
         # Check if it's mostly navigation links (high ratio of nav keywords to total words)
@@ -621,17 +898,19 @@ class WebChangeMonitor:
     def scrape_page(self):
         """Enhanced scrape_page method with advanced mode support"""
         try:
-            if not self.driver:
-                self.setup_driver()
-                
-            self.driver.get(self.url)
-            time.sleep(5)  # Wait for page to load
-            
-            # NEW: Scroll page for advanced mode
-            if self.advanced_mode:
-                self.scroll_to_bottom(self.driver)
-            
-            html_content = self.driver.page_source
+            html_content = self.fetch_html()
+            
+            # Unchanged page (a 304, or the same HTML when the server sends no validators):
+            # reuse the last scrape instead of parsing it again
+            if html_content is NOT_MODIFIED:
+                if self.last_content is None:
+                    print(f"Error scraping page: {self.url} reported unchanged with no previous scrape")
+                    return None
+                return {**self.last_content, 'timestamp': datetime.now().isoformat()}
+            html_digest = hashlib.blake2b(html_content.encode()).digest()
+            if html_digest == self.last_html_digest and self.last_content is not None:
+                self.remember_validators()
+                return {**self.last_content, 'timestamp': datetime.now().isoformat()}
             
             # NEW: Store raw HTML for advanced analysis
             if self.advanced_mode:
@@ -640,7 +919,7 @@ class WebChangeMonitor:
                 self.current_html = cleaned_html
             
             # Parse with BeautifulSoup to extract body content only
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, HTML_PARSER)
             
             # Remove navigation elements before processing
             nav_selectors = [
@@ -724,7 +1003,7 @@ class WebChangeMonitor:
             portfolio_blocks = unique_portfolio_blocks
             
             # Remove script and style elements
-            for script in soup(["script", "style", "noscript"]):
+            for script in soup.select('script, style, noscript'):
                 script.decompose()
             
             # Extract body content
@@ -736,30 +1015,8 @@ class WebChangeMonitor:
             # This helps maintain company names in their context
             structured_text = self.extract_structured_text(body)
             
-            # Get clean text content with better formatting
-            text_content = body.get_text(separator=' ', strip=True)
-            # Clean up excessive whitespace
-            text_content = ' '.join(text_content.split())
-            
-            # Extract links information (filter out navigation links)
-            links_info = []
-            for a in body.find_all('a', href=True):
-                link_text = a.get_text(strip=True)
-                if link_text and not self.is_navigation_content(link_text):
-                    links_info.append({
-                        'text': link_text, 
-                        'href': a.get('href', ''),
-                        'title': a.get('title', ''),
-                        'aria-label': a.get('aria-label', ''),
-                        'data-id': a.get('data-id', '')
-                    })
-            
-            # Extract comprehensive image information (unchanged)
-            images_info = []
-            for img in body.find_all('img'):
-                if img.get('src') or img.get('data-src'):
-                    img_info = self.extract_image_info(img)
-                    images_info.append(img_info)
+            # Text, links and images come from one walk over the body
+            text_content, links_info, images_info = self.extract_body_content(body)
             
             # ENHANCED: Extract relevant information with portfolio structure
             content_data = {
@@ -769,6 +1026,9 @@ class WebChangeMonitor:
                 'text_length': len(text_content),
                 'links': links_info,
                 'images': images_info,
+                # Comparison indexes, built once here and reused while this snapshot is the baseline
+                '_link_index': index_links(links_info),
+                '_image_index': index_images(images_info),
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -783,12 +1043,48 @@ class WebChangeMonitor:
             if self.advanced_mode:
                 print(f"🔬 Advanced mode: Cleaned HTML stored ({len(self.current_html)} chars)")
             
+            self.last_html_digest = html_digest
+            self.last_content = content_data
+            self.remember_validators()
             return content_data
             
         except Exception as e:
             print(f"Error scraping page: {e}")
             return None
 
+    def extract_body_content(self, body):
+        """Collect the page text, non-navigation links and images in a single walk over the body"""
+        text_parts = []
+        links_info = []
+        images_info = []
+        
+        for element in body.descendants:
+            name = element.name
+            if name is None:
+                # Same strings get_text() would join: plain text and CDATA only
+                if type(element) in TEXT_STRING_TYPES:
+                    text = element.strip()
+                    if text:
+                        text_parts.append(text)
+            elif name == 'a':
+                if element.get('href') is not None:
+                    link_text = element.get_text(strip=True)
+                    if link_text and not self.is_navigation_content(link_text):
+                        links_info.append({
+                            'text': link_text, 
+                            'href': element.get('href', ''),
+                            'title': element.get('title', ''),
+                            'aria-label': element.get('aria-label', ''),
+                            'data-id': element.get('data-id', '')
+                        })
+            elif name == 'img':
+                if element.get('src') or element.get('data-src'):
+                    images_info.append(self.extract_image_info(element))
+        
+        # Clean up excessive whitespace
+        text_content = ' '.join(' '.join(text_parts).split())
+        return text_content, links_info, images_info
+    
     def extract_structured_text(self, element):
         """Extract text while preserving heading structure"""
         structured_parts = []
@@ -805,26 +1101,18 @@ class WebChangeMonitor:
         
         return ' '.join(structured_parts)
 
-    def compare_images(self, old_images, new_images):
+    def compare_images(self, old_images, new_images, old_images_dict=None, new_images_dict=None):
         """Compare images with detailed attribute tracking"""
         changes = []
         
-        # Create dictionaries for comparison using unique identifiers
-        old_images_dict = {}
-        new_images_dict = {}
-        
-        # Process old images
-        for img in old_images:
-            key = img.get('unique_id', img.get('src', ''))
-            old_images_dict[key] = img
-            
-        # Process new images
-        for img in new_images:
-            key = img.get('unique_id', img.get('src', ''))
-            new_images_dict[key] = img
+        # Dictionaries keyed by unique identifier; scrape_page already builds them
+        if old_images_dict is None:
+            old_images_dict = index_images(old_images)
+        if new_images_dict is None:
+            new_images_dict = index_images(new_images)
         
         # Find new images
-        new_image_keys = set(new_images_dict.keys()) - set(old_images_dict.keys())
+        new_image_keys = new_images_dict.keys() - old_images_dict.keys()
         if new_image_keys:
             new_image_details = []
             for key in new_image_keys:
@@ -835,20 +1123,7 @@ class WebChangeMonitor:
                    (img.get('title') and self.is_navigation_content(img['title'])):
                     continue
                 
-                context_info = []
-                
-                if img['alt']:
-                    context_info.append(f"Alt: '{img['alt']}'")
-                if img['title']:
-                    context_info.append(f"Title: '{img['title']}'")
-                if img['data-id']:
-                    context_info.append(f"Data-ID: '{img['data-id']}'")
-                if img['aria-label']:
-                    context_info.append(f"Aria-Label: '{img['aria-label']}'")
-                if img['data-caption']:
-                    context_info.append(f"Caption: '{img['data-caption']}'")
-                
-                context_str = " | ".join(context_info) if context_info else "No additional context"
+                context_str = format_image_context(img)
                 
                 new_image_details.append({
                     'src': img['src'],
@@ -878,7 +1153,7 @@ class WebChangeMonitor:
                 changes.append(change_data)
         
         # Find removed images - ENHANCED with detailed reporting
-        removed_image_keys = set(old_images_dict.keys()) - set(new_images_dict.keys())
+        removed_image_keys = old_images_dict.keys() - new_images_dict.keys()
         if removed_image_keys:
             removed_image_details = []
             potential_removed_companies = []
@@ -892,20 +1167,7 @@ class WebChangeMonitor:
                     print(f"🔍 Filtered removed navigation image: {img.get('alt', img.get('src', 'Unknown'))}")
                     continue
                 
-                context_info = []
-                
-                if img['alt']:
-                    context_info.append(f"Alt: '{img['alt']}'")
-                if img['title']:
-                    context_info.append(f"Title: '{img['title']}'")
-                if img['data-id']:
-                    context_info.append(f"Data-ID: '{img['data-id']}'")
-                if img['aria-label']:
-                    context_info.append(f"Aria-Label: '{img['aria-label']}'")
-                if img['data-caption']:
-                    context_info.append(f"Caption: '{img['data-caption']}'")
-                
-                context_str = " | ".join(context_info) if context_info else "No additional context"
+                context_str = format_image_context(img)
                 
                 # Extract potential company name from image
                 potential_company = self.extract_company_from_image(img)
@@ -955,7 +1217,7 @@ class WebChangeMonitor:
                 print(f"🗑️ REMOVED IMAGES: {change_data['description']}")
         
         # Find modified images (same source but different attributes)
-        common_keys = set(old_images_dict.keys()) & set(new_images_dict.keys())
+        common_keys = old_images_dict.keys() & new_images_dict.keys()
         modified_images = []
         
         for key in common_keys:
@@ -1084,7 +1346,68 @@ class WebChangeMonitor:
         
         return potential_company
     
-    def compare_content(self, old_content, new_content):
+    def diff_paragraphs(self, old_paragraphs, new_paragraphs, precise=False):
+        """Return ('removed', old index) and ('added', new index) entries in document order"""
+        changes = []
+        if precise:
+            # Minimal edit script from difflib
+            differ = difflib.SequenceMatcher(None, old_paragraphs, new_paragraphs)
+            for tag, i1, i2, j1, j2 in differ.get_opcodes():
+                if tag in ('delete', 'replace'):
+                    changes.extend(('removed', i) for i in range(i1, i2))
+                if tag in ('insert', 'replace'):
+                    changes.extend(('added', j) for j in range(j1, j2))
+            return changes
+        
+        # The unchanged start and end of the page are matched directly
+        start = 0
+        end_old, end_new = len(old_paragraphs), len(new_paragraphs)
+        while start < end_old and start < end_new and old_paragraphs[start] == new_paragraphs[start]:
+            start += 1
+        while end_old > start and end_new > start and old_paragraphs[end_old - 1] == new_paragraphs[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        
+        # In between, pair each old paragraph with the next unused copy of it on the new page
+        new_positions = {}
+        for j in range(start, end_new):
+            new_positions.setdefault(new_paragraphs[j], deque()).append(j)
+        pairs = []
+        for i in range(start, end_old):
+            positions = new_positions.get(old_paragraphs[i])
+            if positions:
+                pairs.append((i, positions.popleft()))
+        
+        # Keep the longest run of pairs that is in order on both pages (patience sorting,
+        # n log n); paragraphs left out of it moved and are reported as removed and added
+        tail_positions, tail_pairs = [], []
+        previous = [None] * len(pairs)
+        for k, (i, j) in enumerate(pairs):
+            length = bisect.bisect_left(tail_positions, j)
+            if length:
+                previous[k] = tail_pairs[length - 1]
+            if length == len(tail_pairs):
+                tail_positions.append(j)
+                tail_pairs.append(k)
+            else:
+                tail_positions[length] = j
+                tail_pairs[length] = k
+        anchors = []
+        k = tail_pairs[-1] if tail_pairs else None
+        while k is not None:
+            anchors.append(pairs[k])
+            k = previous[k]
+        anchors.reverse()
+        
+        # Between two unchanged paragraphs, removals come before additions (like a difflib replace)
+        next_old = next_new = start
+        for i, j in anchors + [(end_old, end_new)]:
+            changes.extend(('removed', old) for old in range(next_old, i))
+            changes.extend(('added', new) for new in range(next_new, j))
+            next_old, next_new = i + 1, j + 1
+        return changes
+    
+    def compare_content(self, old_content, new_content, precise=False):
         """Compare two content snapshots and find differences - ENHANCED WITH ADVANCED MODE"""
         if not old_content or not new_content:
             return []
@@ -1136,71 +1459,22 @@ class WebChangeMonitor:
             old_paragraphs = [p.strip() for p in old_text.split('\n') if p.strip()]
             new_paragraphs = [p.strip() for p in new_text.split('\n') if p.strip()]
             
-            # Find the differences using difflib for detailed comparison
-            differ = difflib.SequenceMatcher(None, old_paragraphs, new_paragraphs)
-            
             text_changes = []
-            for tag, i1, i2, j1, j2 in differ.get_opcodes():
-                if tag == 'delete':
-                    for i in range(i1, i2):
-                        if len(old_paragraphs[i]) > 5:
-                            # Skip if this is navigation content
-                            if self.is_navigation_content(old_paragraphs[i]):
-                                continue
-                                
-                            removed_text = old_paragraphs[i]
-                            potential_companies = self.extract_company_names(removed_text)
-                            
-                            text_changes.append({
-                                'type': 'removed',
-                                'content': old_paragraphs[i][:200],
-                                'position': i,
-                                'potential_companies': potential_companies,
-                                'is_company_related': len(potential_companies) > 0
-                            })
-                elif tag == 'insert':
-                    for j in range(j1, j2):
-                        if len(new_paragraphs[j]) > 5:
-                            # Skip if this is navigation content
-                            if self.is_navigation_content(new_paragraphs[j]):
-                                continue
-                                
-                            added_text = new_paragraphs[j]
-                            potential_companies = self.extract_company_names(added_text)
-                            
-                            text_changes.append({
-                                'type': 'added',
-                                'content': new_paragraphs[j][:200],
-                                'position': j,
-                                'potential_companies': potential_companies,
-                                'is_company_related': len(potential_companies) > 0
-                            })
-                elif tag == 'replace':
-                    # Handle replacements with navigation filtering
-                    for i in range(i1, i2):
-                        if len(old_paragraphs[i]) > 5 and not self.is_navigation_content(old_paragraphs[i]):
-                            removed_text = old_paragraphs[i]
-                            potential_companies = self.extract_company_names(removed_text)
-                            
-                            text_changes.append({
-                                'type': 'removed',
-                                'content': old_paragraphs[i][:200],
-                                'position': i,
-                                'potential_companies': potential_companies,
-                                'is_company_related': len(potential_companies) > 0
-                            })
-                    for j in range(j1, j2):
-                        if len(new_paragraphs[j]) > 5 and not self.is_navigation_content(new_paragraphs[j]):
-                            added_text = new_paragraphs[j]
-                            potential_companies = self.extract_company_names(added_text)
-                            
-                            text_changes.append({
-                                'type': 'added',
-                                'content': new_paragraphs[j][:200],
-                                'position': j,
-                                'potential_companies': potential_companies,
-                                'is_company_related': len(potential_companies) > 0
-                            })
+            for change_type, i in self.diff_paragraphs(old_paragraphs, new_paragraphs, precise):
+                paragraph = old_paragraphs[i] if change_type == 'removed' else new_paragraphs[i]
+                # Skip short fragments and navigation content
+                if len(paragraph) <= 5 or self.is_navigation_content(paragraph):
+                    continue
+                    
+                potential_companies = self.extract_company_names(paragraph)
+                
+                text_changes.append({
+                    'type': change_type,
+                    'content': paragraph[:200],
+                    'position': i,
+                    'potential_companies': potential_companies,
+                    'is_company_related': len(potential_companies) > 0
+                })
             
             # Apply additional filtering for navigation content
             text_changes = self.filter_navigation_changes(text_changes)
@@ -1258,11 +1532,15 @@ class WebChangeMonitor:
                 print(f"📝 TEXT CHANGES: {change_data['description']}")
         
         # Compare links (with navigation filtering)
-        old_links = {f"{link['href']}|{link['text']}": link for link in old_content.get('links', [])}
-        new_links = {f"{link['href']}|{link['text']}": link for link in new_content.get('links', [])}
+        old_links = old_content.get('_link_index')
+        if old_links is None:
+            old_links = index_links(old_content.get('links', []))
+        new_links = new_content.get('_link_index')
+        if new_links is None:
+            new_links = index_links(new_content.get('links', []))
         
         # Find new links (already filtered during scraping)
-        new_link_keys = set(new_links.keys()) - set(old_links.keys())
+        new_link_keys = new_links.keys() - old_links.keys()
         if new_link_keys:
             new_link_details = []
             for key in new_link_keys:
@@ -1296,7 +1574,7 @@ class WebChangeMonitor:
                 changes.append(change_data)
         
         # Find removed links - ENHANCED with detailed reporting
-        removed_link_keys = set(old_links.keys()) - set(new_links.keys())
+        removed_link_keys = old_links.keys() - new_links.keys()
         if removed_link_keys:
             removed_link_details = []
             potential_removed_companies = []
@@ -1364,7 +1642,9 @@ class WebChangeMonitor:
         # Compare images with enhanced tracking
         image_changes = self.compare_images(
             old_content.get('images', []), 
-            new_content.get('images', [])
+            new_content.get('images', []),
+            old_content.get('_image_index'),
+            new_content.get('_image_index')
         )
         changes.extend(image_changes)
         
@@ -1462,59 +1742,34 @@ class WebChangeMonitor:
 
     def extract_company_names(self, text):
         """Extract potential company names from text using various patterns"""
-        import re
-        
         potential_companies = []
         
         # Pattern 1: All uppercase words (like APTUS)
-        uppercase_pattern = r'\b[A-Z]{2,}\b'
-        uppercase_matches = re.findall(uppercase_pattern, text)
-        potential_companies.extend(uppercase_matches)
+        potential_companies.extend(UPPERCASE_PATTERN.findall(text))
         
         # Pattern 2: Title case words that could be company names
-        title_case_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        title_matches = re.findall(title_case_pattern, text)
+        title_matches = TITLE_CASE_PATTERN.findall(text)
         
         # Filter title case matches to avoid common words
-        common_words = {'The', 'And', 'Or', 'But', 'For', 'With', 'From', 'To', 'Of', 'In', 'On', 'At', 'By'}
-        title_matches = [match for match in title_matches if match not in common_words and len(match) > 3]
+        title_matches = [match for match in title_matches if match not in COMMON_TITLE_WORDS and len(match) > 3]
         potential_companies.extend(title_matches)
         
         # Pattern 3: Look for HTML heading tags (h1, h2, h3, etc.) content
-        heading_pattern = r'<h[1-6][^>]*>(.*?)</h[1-6]>'
-        heading_matches = re.findall(heading_pattern, text, re.IGNORECASE)
+        heading_matches = HEADING_PATTERN.findall(text)
         potential_companies.extend([match.strip() for match in heading_matches if match.strip()])
         
         # Pattern 4: Words immediately after common company indicators
-        company_indicators = ['Company', 'Corp', 'Ltd', 'Inc', 'LLC', 'Holdings', 'Group', 'Industries']
-        for indicator in company_indicators:
-            pattern = rf'\b(\w+)\s+{indicator}\b'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            potential_companies.extend(matches)
+        for indicator in {word.lower() for word in COMPANY_INDICATOR_WORD_PATTERN.findall(text)}:
+            potential_companies.extend(COMPANY_INDICATOR_PATTERNS[indicator].findall(text))
         
         # Remove duplicates and filter out very short matches
-        potential_companies = list(set([company for company in potential_companies if len(company) > 2]))
+        potential_companies = list({company for company in potential_companies if len(company) > 2})
         
         return potential_companies
 
     def build_image_context(self, img):
         """Build context string for an image based on its attributes"""
-        context_parts = []
-        
-        if img['alt']:
-            context_parts.append(f"Alt: '{img['alt']}'")
-        if img['title']:
-            context_parts.append(f"Title: '{img['title']}'")
-        if img['data-id']:
-            context_parts.append(f"Data-ID: '{img['data-id']}'")
-        if img['aria-label']:
-            context_parts.append(f"Aria-Label: '{img['aria-label']}'")
-        if img['data-caption']:
-            context_parts.append(f"Caption: '{img['data-caption']}'")
-        if img['class']:
-            context_parts.append(f"Class: '{img['class']}'")
-        
-        return " | ".join(context_parts) if context_parts else "No context attributes"
+        return format_image_context(img, IMAGE_CONTEXT_FIELDS + (('Class', 'class'),), "No context attributes")
     
     def monitor_loop(self):
         """Main monitoring loop"""
@@ -1550,11 +1805,8 @@ class WebChangeMonitor:
                                 if ai.get('new_companies_detected'):
                                     print(f"    🤖 AI: New companies detected - {[c['name'] for c in ai.get('companies', [])]}")
                         
+                        # The deque drops the oldest changes past its maxlen
                         self.changes.extend(detected_changes)
-                        
-                        # Keep only last 50 changes to prevent memory issues
-                        if len(self.changes) > 50:
-                            self.changes = self.changes[-50:]
                     else:
                         print(f"No changes detected at {datetime.now()}")
                     
@@ -1585,13 +1837,16 @@ class WebChangeMonitor:
     
     def get_changes(self):
         """Get the list of detected changes"""
-        return self.changes
+        return list(self.changes)
 
 # Flask web application
 app = Flask(__name__)
 
+# REQUIRES_JS=1 always uses the browser, REQUIRES_JS=0 always plain HTTP; unset detects it from the page
+REQUIRES_JS = {'1': True, 'true': True, '0': False, 'false': False}.get(os.environ.get("REQUIRES_JS", "").lower())
+
 # Initialize monitor with API key
-monitor = WebChangeMonitor(api_key=os.environ.get("API_KEY"))
+monitor = WebChangeMonitor(api_key=os.environ.get("API_KEY"), requires_js=REQUIRES_JS)
 
 @app.route('/')
 def index():